@@ -1,8 +1,125 @@
 from dotenv import load_dotenv
+import json
 import os
 
 load_dotenv()
 
+# Checked by app/services/llm_client.py, so offline tools such as the
+# bulk scoring CLI can import the services without a key
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if GROQ_API_KEY is None:
-    raise ValueError("GROQ_API_KEY environment variable not set")
\ No newline at end of file
+
+# Upper bound on records accepted by the /predict/*/batch endpoints
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Micro-batching of concurrent single-record predictions. A row is scored
+# together with the rows queued behind it; MICRO_BATCH_WAIT_MS > 0 also
+# lingers for more, but only when other rows are already waiting
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "true").lower() == "true"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", "0"))
+# Requests await their batch on the event loop without holding an inference
+# pool thread; once this many rows are queued for a model they get a 503
+MICRO_BATCH_QUEUE_SIZE = int(os.getenv("MICRO_BATCH_QUEUE_SIZE", "256"))
+
+# Dedicated thread pool for ML inference, kept apart from the I/O threadpool
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "8"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+
+# Shared async Groq client
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # point at a local stub server for testing
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+
+# Optional directory that persists the daily motivation message across restarts
+MOTIVATION_CACHE_DIR = os.getenv("MOTIVATION_CACHE_DIR", "")
+
+# LLM recommendation cache keyed on the normalized rule-based insights
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", "1024"))
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "3600"))
+
+# End-to-end latency budget of /predict/predict-all. The LLM gets what is
+# left after the models; once LLM_HEDGE_SHARE of that has passed a hedged
+# duplicate call is sent (1 disables hedging), and if neither answers in
+# time the rule-based recommendation is returned instead
+PREDICT_ALL_DEADLINE_MS = float(os.getenv("PREDICT_ALL_DEADLINE_MS", "3000"))
+LLM_HEDGE_SHARE = float(os.getenv("LLM_HEDGE_SHARE", "0.5"))
+
+# Bulk recommendations for cohort jobs: users packed per LLM prompt, and
+# batched calls in flight at once
+BULK_RECOMMENDATION_BATCH_SIZE = int(os.getenv("BULK_RECOMMENDATION_BATCH_SIZE", "10"))
+BULK_RECOMMENDATION_CONCURRENCY = int(os.getenv("BULK_RECOMMENDATION_CONCURRENCY", "8"))
+
+# "flat" scores the random forests with the packed-array engine in
+# app/services/forest_engine.py, "sklearn" calls predict_proba directly
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "flat")
+# Larger batches go to sklearn, whose compiled traversal wins at that size
+FLAT_FOREST_MAX_ROWS = int(os.getenv("FLAT_FOREST_MAX_ROWS", "1024"))
+
+# Model loading: compiled flat forests are memory-mapped so forked workers
+# share one read-only copy; warm-up runs before the service reports ready
+# (with MODEL_WARMUP=false it reports ready at once and loads on first use)
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() == "true"
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+# With the flat backend, serve the slimmed forests that train/export_models.py
+# writes to models/compiled/<model>_flat_<MODEL_VARIANT>.joblib instead of
+# the exact export. A variant never falls back to the sklearn pickle, so the
+# pickles stay off the serving heap
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "")
+# Hot reload: every MODEL_RELOAD_INTERVAL_S (0 disables) a background thread
+# checks the model artifacts, and a changed one is loaded and warmed before
+# it replaces the serving version. POST /models/reload checks right away; it
+# requires MODEL_ADMIN_TOKEN in the X-Admin-Token header and is disabled
+# (403) while no token is set
+MODEL_RELOAD_INTERVAL_S = float(os.getenv("MODEL_RELOAD_INTERVAL_S", "30"))
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")
+# Shadow scoring: candidate pickles in SHADOW_MODEL_DIR (same file names as
+# models/) re-score a SHADOW_SAMPLE_RATE share of live predict_proba calls
+# on a background thread; agreement with the serving model is reported at
+# /models and /metrics. Samples are dropped when SHADOW_QUEUE_SIZE are waiting
+SHADOW_MODEL_DIR = os.getenv("SHADOW_MODEL_DIR", "")
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.05"))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "64"))
+
+# Rows scored per chunk by the NDJSON bulk endpoint and CLI
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "512"))
+
+# Rows per vectorized stage when scoring a whole cohort with score_cohort
+COHORT_CHUNK_SIZE = int(os.getenv("COHORT_CHUNK_SIZE", "65536"))
+COHORT_WORKERS = int(os.getenv("COHORT_WORKERS", str(os.cpu_count() or 1)))
+
+# Recommendation rule table: rules/recommendation_rules_<version>.json,
+# or RULE_SET_PATH to load a custom file
+RULE_SET_VERSION = os.getenv("RULE_SET_VERSION", "v1")
+RULE_SET_PATH = os.getenv("RULE_SET_PATH", "")
+
+# Per-model cache of predict_proba rows, keyed on the (optionally rounded)
+# feature vector. PREDICTION_CACHE_ROUNDING is JSON mapping a feature to the
+# decimals it is rounded to for the key, e.g. {"steps_count": -2}
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "100000"))
+PREDICTION_CACHE_MAX_BYTES = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PREDICTION_CACHE_ROUNDING = json.loads(os.getenv("PREDICTION_CACHE_ROUNDING", "{}"))
+
+# Prometheus-style metrics served at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Opt-in request profiling: a PROFILING_SAMPLE_RATE share of requests, any
+# request sending PROFILING_ADMIN_TOKEN in an X-Profile header and, when
+# PROFILING_SLOW_MS > 0, any request slower than that is stack-sampled every
+# PROFILING_INTERVAL_MS. Slow requests are cut from an always-on sampler's
+# last PROFILING_HISTORY_S seconds of stacks; PROFILING_SAMPLE_RATE=0 keeps
+# only those. The last PROFILING_BUFFER_SIZE profiles are kept. Can also be
+# switched on at runtime via /profiling/config. The admin endpoints and the
+# X-Profile header require PROFILING_ADMIN_TOKEN and are disabled (403)
+# while it is unset
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SLOW_MS = float(os.getenv("PROFILING_SLOW_MS", "0"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_BUFFER_SIZE = int(os.getenv("PROFILING_BUFFER_SIZE", "100"))
+PROFILING_HISTORY_S = float(os.getenv("PROFILING_HISTORY_S", "10"))
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
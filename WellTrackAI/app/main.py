@@ -1,8 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routes import mood, sleep, habit, all_in_one, motivation
+from app.routes import mood, sleep, habit, all_in_one, motivation, batching, cache, health, bulk, metrics, profiling, models
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import MODEL_WARMUP
+from app.services import inference_pool, llm_client, model_registry
+from app.services.metrics import MetricsMiddleware
+from app.services.profiler import ProfilingMiddleware
 
-app = FastAPI(title="WellTrack AI Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uvicorn only starts accepting requests once startup finishes,
+    # so the first request never pays the model load cost.
+    if MODEL_WARMUP:
+        await asyncio.to_thread(model_registry.warm_up)
+    else:
+        # Models load on first use; nothing to wait for before serving
+        model_registry.mark_ready()
+    model_registry.start_watcher()
+    yield
+    model_registry.stop_watcher()
+    inference_pool.shutdown()
+    await llm_client.close()
+
+
+app = FastAPI(title="WellTrack AI Service", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +34,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 
 app.include_router(mood.router, prefix="/predict")
@@ -19,5 +44,12 @@ app.include_router(habit.router, prefix="/predict")
 
 
 app.include_router(all_in_one.router, prefix="/predict")
+app.include_router(bulk.router, prefix="/predict")
 app.include_router(motivation.router, prefix="/motivation")
+app.include_router(batching.router, prefix="/batching")
+app.include_router(cache.router, prefix="/cache")
+app.include_router(health.router, prefix="/health")
+app.include_router(metrics.router)
+app.include_router(profiling.router, prefix="/profiling")
+app.include_router(models.router, prefix="/models")
 
@@ -1,85 +1,57 @@
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.core.config import LLM_HEDGE_SHARE, PREDICT_ALL_DEADLINE_MS
 from app.schemas.recommendation import RecommendationRequest, RecommendationResponse
-from app.services.habit_model import predict_habit
-from app.services.mood_model import mood_model, mood_label_encoder
-from app.services.sleep_model import sleep_model, SLEEP_LABELS
-from app.services.recommendation_rules import generate_rule_based_context
-from app.services.groq_llm import generate_llm_recommendation
+from app.services.habit_model import predict_habit_async
+from app.services.mood_model import predict_mood_async
+from app.services.sleep_model import predict_sleep_async
+from app.services.features import CHAIN_INPUT_SPEC, CHAIN_ROWS
+from app.services.recommendation_rules import generate_rule_based_context, generate_rule_based_recommendation
+from app.services.groq_llm import get_llm_recommendation_within, stream_llm_recommendation_cached
+from app.services.metrics import RECOMMENDATION_SOURCE, STAGE_LATENCY
+from app.services.model_registry import get_model_versions, get_models
+from app.services.serialization import FastJSONResponse, dumps
 
 router = APIRouter(tags=["AllInOne"])
 
-@router.post("/predict-all", response_model=RecommendationResponse)
-def predict_all(data: RecommendationRequest):
-    sleep_quality_map = {"Poor": 0, "Average": 1, "Good": 2}
-    mood_value_map = {
-        "Angry": 0,
-        "Sad": 1,
-        "Neutral": 2,
-        "Relaxed": 3,
-        "Happy": 4
-    } 
-
-    sleep_quality = data.sleep.get("quality", 1)
-    if isinstance(sleep_quality, str):
-        sleep_quality = sleep_quality_map.get(sleep_quality, 1)
-
-    mood_value = data.mood.get("value", 1)
-    if isinstance(mood_value, str):
-        mood_value = mood_value_map.get(mood_value, 1)
-
-    habit_features = [
-        float(data.habit.get("previous_habit_ratio", 0)),
-        float(data.sleep.get("hours", 0)),
-        float(sleep_quality),        
-        float(data.water_liters),
-        float(data.steps),
-        float(data.calories),
-        float(data.protein),
-        float(data.carbs),
-        float(data.fat),
-        float(mood_value)             
-    ]
-    habit_pred, habit_conf = predict_habit(habit_features)
+async def _run_models(data: RecommendationRequest, models: dict):
+    """
+    Chains the habit, mood and sleep models of models (from get_models).
+    Each stage awaits its micro-batch, or runs on the inference pool when
+    micro-batching is off.
+    """
+    with STAGE_LATENCY.time("features"):
+        inputs = CHAIN_INPUT_SPEC.values(data)
+
+    with STAGE_LATENCY.time("habit_model"):
+        habit_pred, habit_conf = await predict_habit_async(CHAIN_ROWS["habit"].row(inputs), models["habit"])
     habit_result = {"predicted_success": habit_pred, "confidence": round(habit_conf, 3)}
 
-    mood_features = [[
-        float(data.sleep.get("hours", 0)),
-        float(sleep_quality),
-        float(data.water_liters),
-        float(data.steps),
-        float(data.mood.get("activity_type", 0)),
-        float(data.calories),
-        float(data.protein),
-        float(data.carbs),
-        float(data.fat),
-        habit_result["confidence"]
-    ]]
-    mood_prob = mood_model.predict_proba(mood_features)[0]
-    mood_index = int(mood_prob.argmax())
+    with STAGE_LATENCY.time("mood_model"):
+        predicted_mood, mood_conf = await predict_mood_async(CHAIN_ROWS["mood"].row(inputs, habit_result["confidence"]), models["mood"])
     mood_result = {
-        "predicted_mood": mood_label_encoder.inverse_transform([mood_index])[0],
-        "confidence": round(float(mood_prob[mood_index]), 3)
+        "predicted_mood": predicted_mood,
+        "confidence": round(mood_conf, 3)
     }
 
-    sleep_features = [[
-        float(data.steps),
-        float(data.mood.get("activity_type", 0)),
-        float(data.water_liters),
-        float(data.calories),
-        float(data.protein),
-        float(data.carbs),
-        float(data.fat),
-        habit_result["confidence"],
-        mood_result["confidence"]
-    ]]
-    sleep_prob = sleep_model.predict_proba(sleep_features)[0]
-    sleep_index = int(sleep_prob.argmax())
+    with STAGE_LATENCY.time("sleep_model"):
+        predicted_sleep, sleep_conf = await predict_sleep_async(
+            CHAIN_ROWS["sleep"].row(inputs, habit_result["confidence"], mood_result["confidence"]),
+            models["sleep"],
+        )
     sleep_result = {
-        "predicted_sleep_quality": SLEEP_LABELS[sleep_index],
-        "confidence": round(float(sleep_prob[sleep_index]), 3)
+        "predicted_sleep_quality": predicted_sleep,
+        "confidence": round(sleep_conf, 3)
     }
 
-    context_points = generate_rule_based_context({
+    return habit_result, mood_result, sleep_result
+
+
+def _rule_input(data: RecommendationRequest, habit_result, mood_result, sleep_result) -> dict:
+    return {
         "habit": habit_result,
         "mood": mood_result,
         "sleep": sleep_result,
@@ -89,8 +61,94 @@ def predict_all(data: RecommendationRequest):
         "protein": data.protein,
         "carbs": data.carbs,
         "fat": data.fat
-    })
+    }
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+@router.post("/predict-all", response_model=RecommendationResponse)
+async def predict_all(data: RecommendationRequest):
+    """
+    Answers within PREDICT_ALL_DEADLINE_MS. "source" in the response says
+    whether the recommendation came from the LLM, a hedged LLM call, the
+    cache or, when the LLM misses the deadline, the rule-based fallback;
+    "model_versions" names the habit, mood and sleep model versions.
+    """
+    started = time.perf_counter()
+    models = get_models()
+    with STAGE_LATENCY.time("models"):
+        habit_result, mood_result, sleep_result = await _run_models(data, models)
+
+    with STAGE_LATENCY.time("rules"):
+        rule_input = _rule_input(data, habit_result, mood_result, sleep_result)
+        context_points = generate_rule_based_context(rule_input)
+
+    with STAGE_LATENCY.time("llm"):
+        budget = PREDICT_ALL_DEADLINE_MS / 1000 - (time.perf_counter() - started)
+        llm_result, source = await get_llm_recommendation_within(context_points, budget, LLM_HEDGE_SHARE)
+
+    if llm_result is None:
+        llm_result, source = generate_rule_based_recommendation(rule_input), "fallback"
+    RECOMMENDATION_SOURCE.inc(source)
+
+    return FastJSONResponse({**llm_result, "source": source, "model_versions": get_model_versions(models)})
+
+
+@router.post("/predict-all/stream")
+async def predict_all_stream(data: RecommendationRequest):
+    """
+    Server-Sent Events version of /predict-all. Sends a "predictions"
+    event with the three model results as soon as they are ready, then a
+    "summary" event and one "action_item" event per line as the LLM
+    writes them, and finally "done" with the same body /predict-all
+    returns. An LLM failure ends the stream with an "error" event.
+    """
+    models = get_models()
+    with STAGE_LATENCY.time("models"):
+        habit_result, mood_result, sleep_result = await _run_models(data, models)
+
+    with STAGE_LATENCY.time("rules"):
+        context_points = generate_rule_based_context(_rule_input(data, habit_result, mood_result, sleep_result))
+    model_versions = get_model_versions(models)
+
+    async def events():
+        yield _sse("predictions", {
+            "habit": habit_result,
+            "mood": mood_result,
+            "sleep": sleep_result,
+            "model_versions": model_versions,
+        })
+
+        started = time.perf_counter()
+        source, summary, action_items = "llm", None, []
+        try:
+            async for kind, line in stream_llm_recommendation_cached(context_points):
+                if kind == "source":
+                    source = line
+                elif kind == "summary":
+                    STAGE_LATENCY.observe(time.perf_counter() - started, "llm_first_line")
+                    summary = line
+                    yield _sse("summary", {"summary": line})
+                else:
+                    yield _sse("action_item", {"index": len(action_items), "text": line})
+                    action_items.append(line)
+        except Exception:
+            yield _sse("error", {"detail": "Recommendation generation failed"})
+            return
+        STAGE_LATENCY.observe(time.perf_counter() - started, "llm")
 
-    llm_result = generate_llm_recommendation(context_points)
+        yield _sse("done", {
+            "summary": summary,
+            "action_items": action_items,
+            "source": source,
+            "model_versions": model_versions,
+        })
 
-    return llm_result
+    # X-Accel-Buffering stops nginx from holding events back
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
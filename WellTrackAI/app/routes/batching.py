@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from app.services.habit_model import habit_batcher
+from app.services.mood_model import mood_batcher
+from app.services.sleep_model import sleep_batcher
+
+router = APIRouter(tags=["Batching"])
+
+@router.get("/stats")
+def get_batching_stats():
+    """
+    Window wait time and batch size statistics for the micro-batchers,
+    used to tune MICRO_BATCH_MAX_SIZE and MICRO_BATCH_WAIT_MS.
+    """
+    return {
+        batcher.name: batcher.stats()
+        for batcher in (habit_batcher, mood_batcher, sleep_batcher)
+    }
@@ -0,0 +1,67 @@
+from typing import Literal
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import BULK_CHUNK_SIZE, MAX_BATCH_SIZE
+from app.services.bulk_scoring import parse_record, score_chunk
+from app.services.inference_pool import run_inference
+
+router = APIRouter(tags=["Bulk"])
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams results while the request body is still being read.
+    StreamingResponse would also consume receive() to watch for
+    disconnects and steal body chunks; here reading the body already
+    raises ClientDisconnect when the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def _iter_lines(request: Request):
+    buffer = b""
+    async for piece in request.stream():
+        buffer += piece
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+@router.post("/bulk/{model}")
+async def predict_bulk(
+    model: Literal["habit", "mood", "sleep", "chain"],
+    request: Request,
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=MAX_BATCH_SIZE),
+):
+    """
+    Scores a newline-delimited JSON body and streams NDJSON results back
+    chunk by chunk, so memory use does not grow with the input size.
+    'chain' records use the predict-all shape and run habit -> mood -> sleep.
+    Each output line carries the 1-based input line number; invalid lines
+    produce an "error" entry instead of failing the stream. Chunks wait
+    for an inference slot rather than being rejected with a 503, which
+    could not be sent once the first results are out.
+    """
+
+    async def results():
+        chunk = []
+        line_no = 0
+        async for line in _iter_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            record, error = parse_record(model, line_no, line)
+            chunk.append((line_no, record, error))
+            if len(chunk) >= chunk_size:
+                yield await run_inference(score_chunk, model, chunk, wait=True)
+                chunk = []
+        if chunk:
+            yield await run_inference(score_chunk, model, chunk, wait=True)
+
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
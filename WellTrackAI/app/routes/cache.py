@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from app.services.groq_llm import recommendation_cache
+from app.services.habit_model import habit_cache
+from app.services.mood_model import mood_cache
+from app.services.sleep_model import sleep_cache
+
+router = APIRouter(tags=["Cache"])
+
+@router.get("/stats")
+def get_cache_stats():
+    """
+    Size, hit/miss and eviction counters for the in-process caches.
+    """
+    return {
+        "recommendation": recommendation_cache.stats(),
+        "predictions": {
+            cache.name: cache.stats()
+            for cache in (habit_cache, mood_cache, sleep_cache)
+        },
+    }
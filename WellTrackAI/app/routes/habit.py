@@ -1,22 +1,37 @@
 from fastapi import APIRouter
-from app.schemas.habit import HabitPredictionRequest, HabitPredictionResponse
-from app.services.habit_model import predict_habit
+
+from app.schemas.habit import (
+    HabitPredictionRequest,
+    HabitPredictionResponse,
+    HabitBatchRequest,
+    HabitBatchResponse,
+)
+from app.services.features import HABIT_SPEC
+from app.services.habit_model import predict_habit_async, predict_habit_batch
+from app.services.inference_pool import run_inference
+from app.services.model_registry import get_model
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter(tags=["Habit"])
 
+
 @router.post("/habit", response_model=HabitPredictionResponse)
-def predict_habit_endpoint(data: HabitPredictionRequest):
-    features = [
-        data.previous_habit_ratio,
-        data.sleep_hours,
-        data.sleep_quality,
-        data.water_liters,
-        data.steps_count,
-        data.calories,
-        data.protein,
-        data.carbs,
-        data.fat,
-        data.mood
-    ]
-    pred, conf = predict_habit(features)
-    return {"predicted_success": pred, "confidence": round(conf, 3)}
+async def predict_habit_endpoint(data: HabitPredictionRequest):
+    model = get_model("habit")
+    pred, conf = await predict_habit_async(HABIT_SPEC.row(data), model)
+    return FastJSONResponse({"predicted_success": pred, "confidence": round(conf, 3), "model_version": model.version})
+
+
+@router.post("/habit/batch", response_model=HabitBatchResponse)
+async def predict_habit_batch_endpoint(data: HabitBatchRequest):
+    features = HABIT_SPEC.matrix(data.records)
+    model = get_model("habit")
+    preds, confidences = await run_inference(predict_habit_batch, features, model)
+
+    return FastJSONResponse({
+        "results": [
+            {"predicted_success": pred, "confidence": round(conf, 3)}
+            for pred, conf in zip(preds, confidences)
+        ],
+        "model_version": model.version,
+    })
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.model_registry import is_ready
+
+router = APIRouter(tags=["Health"])
+
+@router.get("/live")
+def liveness():
+    return {"status": "ok"}
+
+@router.get("/ready")
+def readiness():
+    """
+    Reports ready once the models are loaded and warmed up, or at
+    startup when MODEL_WARMUP is off and models load on first use.
+    """
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
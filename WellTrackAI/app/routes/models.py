@@ -0,0 +1,32 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from app.core.config import MODEL_ADMIN_TOKEN
+from app.services import model_registry
+
+router = APIRouter(tags=["Models"])
+
+
+@router.get("")
+def get_models():
+    """
+    Serving version, recent versions and last load error of each model,
+    plus shadow candidate agreement when SHADOW_MODEL_DIR is set.
+    """
+    return model_registry.status()
+
+
+@router.post("/reload")
+async def reload_models(x_admin_token: Optional[str] = Header(None)):
+    """
+    Checks the model artifacts now instead of waiting for the watcher.
+    New versions are warmed before they are swapped in, so requests keep
+    being served throughout.
+    """
+    # Fails closed: without a configured token reloads are disabled
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model reload is disabled; set MODEL_ADMIN_TOKEN")
+    if x_admin_token != MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    changed = await asyncio.to_thread(model_registry.reload_models)
+    return {"reloaded": changed, "versions": model_registry.get_model_versions()}
@@ -1,34 +1,42 @@
 from fastapi import APIRouter
-import numpy as np
 
-from app.schemas.mood import MoodPredictionRequest, MoodPredictionResponse
-from app.services.mood_model import mood_model, mood_label_encoder
+from app.schemas.mood import (
+    MoodPredictionRequest,
+    MoodPredictionResponse,
+    MoodBatchRequest,
+    MoodBatchResponse,
+)
+from app.services.features import MOOD_SPEC
+from app.services.mood_model import predict_mood_async, predict_mood_batch
+from app.services.inference_pool import run_inference
+from app.services.model_registry import get_model
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter(tags=["Mood"])
 
+
 @router.post("/mood", response_model=MoodPredictionResponse)
-def predict_mood(data: MoodPredictionRequest):
-
-    features = np.array([[
-        data.sleep_hours,
-        data.sleep_quality,
-        data.water_liters,
-        data.steps_count,
-        data.activity_type,
-        data.calories,
-        data.protein,
-        data.carbs,
-        data.fat,
-        data.habit_completion_ratio
-    ]])
-
-    probabilities = mood_model.predict_proba(features)[0]
-    predicted_index = int(np.argmax(probabilities))
-
-    predicted_mood = mood_label_encoder.inverse_transform([predicted_index])[0]
-    confidence = float(probabilities[predicted_index])
-
-    return {
+async def predict_mood(data: MoodPredictionRequest):
+    model = get_model("mood")
+    predicted_mood, confidence = await predict_mood_async(MOOD_SPEC.row(data), model)
+
+    return FastJSONResponse({
         "predicted_mood": predicted_mood,
-        "confidence": round(confidence, 3)
-    }
+        "confidence": round(confidence, 3),
+        "model_version": model.version,
+    })
+
+
+@router.post("/mood/batch", response_model=MoodBatchResponse)
+async def predict_mood_batch_endpoint(data: MoodBatchRequest):
+    features = MOOD_SPEC.matrix(data.records)
+    model = get_model("mood")
+    moods, confidences = await run_inference(predict_mood_batch, features, model)
+
+    return FastJSONResponse({
+        "results": [
+            {"predicted_mood": mood, "confidence": round(conf, 3)}
+            for mood, conf in zip(moods, confidences)
+        ],
+        "model_version": model.version,
+    })
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from datetime import date
 from app.schemas.motivation import DailyMotivationResponse
-from app.services.motivation_llm import generate_daily_motivation
+from app.services.motivation_llm import get_daily_motivation_cached
 
 router = APIRouter(tags=["Motivation"])
 
@@ -9,13 +9,14 @@ router = APIRouter(tags=["Motivation"])
     "/daily",
     response_model=DailyMotivationResponse
 )
-def get_daily_motivation():
+async def get_daily_motivation():
     """
     Returns a short motivational message for today.
-    The date is automatically set to today.
+    The date is automatically set to today and the message is
+    generated once per day.
     """
     today = date.today()
-    message = generate_daily_motivation(today)
+    message = await get_daily_motivation_cached(today)
 
     return DailyMotivationResponse(
         date=today,
@@ -0,0 +1,74 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.core.config import PROFILING_ADMIN_TOKEN
+from app.schemas.profiling import ProfilingConfigRequest
+from app.services.profiler import profiler
+
+router = APIRouter(tags=["Profiling"])
+
+
+def _check_token(token: Optional[str]):
+    # Fails closed: without a configured token the endpoints stay disabled
+    if not PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Profiling admin endpoints are disabled; set PROFILING_ADMIN_TOKEN")
+    if token != PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/config")
+def get_profiling_config():
+    return profiler.settings()
+
+
+@router.post("/config")
+def set_profiling_config(data: ProfilingConfigRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Turns profiling on or off and adjusts the sample rate and slow-request
+    threshold at runtime. Unset fields are left unchanged. Setting
+    sample_rate to 1 profiles every request; slow_ms above 0 also keeps
+    every slower request, whatever the sample rate.
+    """
+    _check_token(x_admin_token)
+    profiler.configure(data.enabled, data.sample_rate, data.slow_ms)
+    return profiler.settings()
+
+
+@router.get("/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Summaries of the buffered profiles, oldest first."""
+    _check_token(x_admin_token)
+    return [profile.summary() for profile in list(profiler.profiles)]
+
+
+@router.get("/profiles/collapsed", response_class=PlainTextResponse)
+def download_collapsed(path: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    All buffered profiles (or those of one request path) merged into
+    collapsed-stack text for flamegraph.pl or speedscope.
+    """
+    _check_token(x_admin_token)
+    profiles = [p for p in list(profiler.profiles) if path is None or p.path == path]
+    return PlainTextResponse(
+        profiler.collapsed(profiles),
+        headers={"Content-Disposition": 'attachment; filename="profiles.collapsed"'},
+    )
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def download_profile(profile_id: int, x_admin_token: Optional[str] = Header(None)):
+    _check_token(x_admin_token)
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or no longer buffered")
+    return PlainTextResponse(
+        profiler.collapsed([profile]),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
+
+
+@router.delete("/profiles")
+def clear_profiles(x_admin_token: Optional[str] = Header(None)):
+    _check_token(x_admin_token)
+    profiler.clear()
+    return {"status": "cleared"}
@@ -1,30 +1,42 @@
 from fastapi import APIRouter
-import numpy as np
 
-from app.schemas.sleep import SleepPredictionRequest, SleepPredictionResponse
-from app.services.sleep_model import sleep_model, SLEEP_LABELS
+from app.schemas.sleep import (
+    SleepPredictionRequest,
+    SleepPredictionResponse,
+    SleepBatchRequest,
+    SleepBatchResponse,
+)
+from app.services.features import SLEEP_SPEC
+from app.services.sleep_model import predict_sleep_async, predict_sleep_batch
+from app.services.inference_pool import run_inference
+from app.services.model_registry import get_model
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter(tags=["Sleep"])
 
+
 @router.post("/sleep", response_model=SleepPredictionResponse)
-def predict_sleep(data: SleepPredictionRequest):
-
-    features = np.array([[
-        data.steps_count,
-        data.activity_type,
-        data.water_liters,
-        data.calories,
-        data.protein,
-        data.carbs,
-        data.fat,
-        data.habit_completion_ratio,
-        data.mood
-    ]])
-
-    probabilities = sleep_model.predict_proba(features)[0]
-    predicted_index = int(np.argmax(probabilities))
-
-    return {
-        "predicted_sleep_quality": SLEEP_LABELS[predicted_index],
-        "confidence": round(float(probabilities[predicted_index]), 3)
-    }
+async def predict_sleep(data: SleepPredictionRequest):
+    model = get_model("sleep")
+    predicted_quality, confidence = await predict_sleep_async(SLEEP_SPEC.row(data), model)
+
+    return FastJSONResponse({
+        "predicted_sleep_quality": predicted_quality,
+        "confidence": round(confidence, 3),
+        "model_version": model.version,
+    })
+
+
+@router.post("/sleep/batch", response_model=SleepBatchResponse)
+async def predict_sleep_batch_endpoint(data: SleepBatchRequest):
+    features = SLEEP_SPEC.matrix(data.records)
+    model = get_model("sleep")
+    qualities, confidences = await run_inference(predict_sleep_batch, features, model)
+
+    return FastJSONResponse({
+        "results": [
+            {"predicted_sleep_quality": quality, "confidence": round(conf, 3)}
+            for quality, conf in zip(qualities, confidences)
+        ],
+        "model_version": model.version,
+    })
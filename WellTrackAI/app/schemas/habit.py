@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.core.config import MAX_BATCH_SIZE
 
 class HabitPredictionRequest(BaseModel):
     previous_habit_ratio: float
@@ -12,6 +13,19 @@ class HabitPredictionRequest(BaseModel):
     fat: float
     mood: int 
 
-class HabitPredictionResponse(BaseModel):
+class HabitResult(BaseModel):
     predicted_success: int
     confidence: float
+
+
+class HabitPredictionResponse(HabitResult):
+    model_version: str
+
+
+class HabitBatchRequest(BaseModel):
+    records: list[HabitPredictionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class HabitBatchResponse(BaseModel):
+    results: list[HabitResult]
+    model_version: str
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.core.config import MAX_BATCH_SIZE
 
 class MoodPredictionRequest(BaseModel):
     sleep_hours: float
@@ -13,6 +14,19 @@ class MoodPredictionRequest(BaseModel):
     habit_completion_ratio: float
 
 
-class MoodPredictionResponse(BaseModel):
+class MoodResult(BaseModel):
     predicted_mood: str
     confidence: float
+
+
+class MoodPredictionResponse(MoodResult):
+    model_version: str
+
+
+class MoodBatchRequest(BaseModel):
+    records: list[MoodPredictionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class MoodBatchResponse(BaseModel):
+    results: list[MoodResult]
+    model_version: str
@@ -0,0 +1,8 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ProfilingConfigRequest(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    slow_ms: Optional[float] = Field(None, ge=0)
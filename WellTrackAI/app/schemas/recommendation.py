@@ -1,10 +1,42 @@
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, Literal, Union
+from typing_extensions import NotRequired, TypedDict
+
+SLEEP_QUALITY_CODES = {"Poor": 0, "Average": 1, "Good": 2}
+MOOD_VALUE_CODES = {
+    "Angry": 0,
+    "Sad": 1,
+    "Neutral": 2,
+    "Relaxed": 3,
+    "Happy": 4
+}
+
+# Either the label or its code; app/services/features.py maps labels to codes
+SleepQuality = Union[Annotated[int, Field(ge=0, le=2)], Literal["Poor", "Average", "Good"]]
+MoodValue = Union[Annotated[int, Field(ge=0, le=4)], Literal["Angry", "Sad", "Neutral", "Relaxed", "Happy"]]
+
+
+# The nested sections are TypedDicts rather than models: pydantic-core
+# validates them just as strictly, without building an object for each.
+# Omitted fields take the defaults in features.CHAIN_INPUT_DEFAULTS.
+class HabitInput(TypedDict):
+    previous_habit_ratio: NotRequired[float]
+
+
+class MoodInput(TypedDict):
+    value: NotRequired[MoodValue]
+    activity_type: NotRequired[Annotated[int, Field(ge=0, le=3)]]  # 0=Walking, 1=Running, 2=Cycling, 3=Hiking
+
+
+class SleepInput(TypedDict):
+    hours: NotRequired[float]
+    quality: NotRequired[SleepQuality]
+
 
 class RecommendationRequest(BaseModel):
-    habit: Dict[str, Any]
-    mood: Dict[str, Any]
-    sleep: Dict[str, Any]
+    habit: HabitInput
+    mood: MoodInput
+    sleep: SleepInput
     steps: int
     water_liters: float
     calories: int
@@ -16,3 +48,5 @@ class RecommendationRequest(BaseModel):
 class RecommendationResponse(BaseModel):
     summary: str
     action_items: list[str]
+    source: Literal["llm", "hedge", "cache", "fallback"] = "llm"
+    model_versions: Dict[str, str] = {}
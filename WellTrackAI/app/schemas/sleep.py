@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.core.config import MAX_BATCH_SIZE
 
 class SleepPredictionRequest(BaseModel):
     steps_count: int
@@ -12,6 +13,19 @@ class SleepPredictionRequest(BaseModel):
     mood: int  
 
 
-class SleepPredictionResponse(BaseModel):
+class SleepResult(BaseModel):
     predicted_sleep_quality: str
     confidence: float
+
+
+class SleepPredictionResponse(SleepResult):
+    model_version: str
+
+
+class SleepBatchRequest(BaseModel):
+    records: list[SleepPredictionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class SleepBatchResponse(BaseModel):
+    results: list[SleepResult]
+    model_version: str
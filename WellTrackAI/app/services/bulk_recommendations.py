@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+from app.core.config import BULK_RECOMMENDATION_BATCH_SIZE, BULK_RECOMMENDATION_CONCURRENCY
+from app.services.groq_llm import (
+    LLM_MODEL,
+    _cache_key,
+    _clean_line,
+    generate_llm_recommendation,
+    normalize_insights,
+    recommendation_cache,
+)
+from app.services.llm_client import chat_completion
+
+# Completion tokens allowed per user in a batched call
+TOKENS_PER_USER = 160
+
+
+def build_batch_prompt(batch: list[list[str]]) -> str:
+    """One prompt for several users; user i of the batch is listed as "User i"."""
+    users = "\n".join(f"User {i}: {', '.join(points)}" for i, points in enumerate(batch, start=1))
+    return f"""
+You are a health AI assistant.
+
+Below are the insights for {len(batch)} users, one user per line.
+
+{users}
+
+For every user, generate:
+- "summary": one short friendly summary sentence (1-2 lines max)
+- "action_items": 3–5 concise actionable health recommendations
+Use plain text only, without Markdown symbols.
+
+Respond with only a JSON object of the form
+{{"results": [{{"id": 1, "summary": "...", "action_items": ["...", "..."]}}]}}
+with exactly one entry per user id.
+"""
+
+
+def parse_batch_response(text: str, n_users: int) -> dict:
+    """
+    Extracts {user index: recommendation} from a batched completion.
+    Entries that are missing, duplicated or malformed are left out, so the
+    caller can re-send those users on their own.
+    """
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        # Tolerate prose around the JSON object
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            payload = json.loads(text[start:end + 1]) if start != -1 else {}
+        except ValueError:
+            return {}
+
+    entries = payload.get("results") if isinstance(payload, dict) else payload
+    parsed = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        summary = entry.get("summary")
+        items = entry.get("action_items")
+        if not 1 <= index <= n_users or index in parsed:
+            continue
+        if not isinstance(summary, str) or not summary.strip() or not isinstance(items, list):
+            continue
+        items = [_clean_line(item) for item in items if isinstance(item, str) and item.strip()]
+        if items:
+            parsed[index] = {"summary": _clean_line(summary), "action_items": items[:5]}
+    return parsed
+
+
+async def _generate_batch(batch: list[list[str]]) -> dict:
+    response = await chat_completion(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": build_batch_prompt(batch)}],
+        temperature=0.4,
+        max_tokens=TOKENS_PER_USER * len(batch),
+        response_format={"type": "json_object"},
+    )
+    return parse_batch_response(response.choices[0].message.content, len(batch))
+
+
+async def generate_bulk_recommendations(
+    insights: list[list[str]],
+    batch_size: int = BULK_RECOMMENDATION_BATCH_SIZE,
+    concurrency: int = BULK_RECOMMENDATION_CONCURRENCY,
+) -> list[tuple]:
+    """
+    Recommendations for a whole cohort, given each user's insight list.
+    Users whose normalized insights match share one result, cached results
+    are reused, and the rest are packed batch_size users to a prompt with
+    at most `concurrency` calls in flight. Users missing from a batch's
+    parsed reply are re-sent one by one through generate_llm_recommendation;
+    a batch call that fails outright fails its users instead.
+
+    Returns one (recommendation, source) per user, in order; source is
+    "cache", "batch", "single", or "error" with a None recommendation.
+    """
+    keys = []
+    pending = {}
+    results = {}
+    for points in insights:
+        normalized = normalize_insights(points)
+        key = _cache_key(normalized)
+        keys.append(key)
+        if key in results or key in pending:
+            continue
+        cached = recommendation_cache.get(key)
+        if cached is not None:
+            results[key] = (cached, "cache")
+        else:
+            pending[key] = normalized
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_single(key: str):
+        async with semaphore:
+            try:
+                recommendation = await generate_llm_recommendation(pending[key])
+            except Exception:
+                results[key] = (None, "error")
+                return
+        recommendation_cache.set(key, recommendation)
+        results[key] = (recommendation, "single")
+
+    async def run_batch(batch_keys: list[str]):
+        async with semaphore:
+            try:
+                parsed = await _generate_batch([pending[key] for key in batch_keys])
+            except Exception:
+                # chat_completion has already retried transient errors, so
+                # the provider is struggling; re-sending every user on their
+                # own would only multiply the load
+                for key in batch_keys:
+                    results[key] = (None, "error")
+                return
+        retry = []
+        for index, key in enumerate(batch_keys, start=1):
+            recommendation = parsed.get(index)
+            if recommendation is None:
+                retry.append(key)
+                continue
+            recommendation_cache.set(key, recommendation)
+            results[key] = (recommendation, "batch")
+        await asyncio.gather(*(run_single(key) for key in retry))
+
+    unique = list(pending)
+    await asyncio.gather(*(
+        run_batch(unique[start:start + batch_size]) for start in range(0, len(unique), batch_size)
+    ))
+    # Users with the same insights, and the cache, share one dict; each
+    # caller gets its own copy
+    return [_copy(recommendation, source) for recommendation, source in (results[key] for key in keys)]
+
+
+def _copy(recommendation, source: str) -> tuple:
+    if recommendation is None:
+        return None, source
+    return {"summary": recommendation["summary"], "action_items": list(recommendation["action_items"])}, source
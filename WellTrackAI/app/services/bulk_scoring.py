@@ -0,0 +1,120 @@
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+
+from app.schemas.habit import HabitPredictionRequest
+from app.schemas.mood import MoodPredictionRequest
+from app.schemas.recommendation import RecommendationRequest
+from app.schemas.sleep import SleepPredictionRequest
+from app.services.features import HABIT_SPEC, MOOD_SPEC, SLEEP_SPEC
+from app.services.habit_model import predict_habit_batch
+from app.services.model_registry import get_model, get_model_versions, get_models
+from app.services.mood_model import predict_mood_batch
+from app.services.pipeline import run_chain_batch
+from app.services.serialization import dumps
+from app.services.sleep_model import predict_sleep_batch
+
+RECORD_SCHEMAS = {
+    "habit": HabitPredictionRequest,
+    "mood": MoodPredictionRequest,
+    "sleep": SleepPredictionRequest,
+    "chain": RecommendationRequest,
+}
+
+
+def parse_record(model: str, line_no: int, line):
+    """
+    Validates one NDJSON line. Returns (record, None) or, for a bad line,
+    (None, error_row) so the stream can carry on.
+    """
+    try:
+        return RECORD_SCHEMAS[model].model_validate_json(line), None
+    except ValidationError as exc:
+        message = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+            for error in exc.errors()
+        )
+        return None, {"line": line_no, "error": message}
+
+
+def _score_habit(records: list) -> list[dict]:
+    features = HABIT_SPEC.matrix(records)
+    model = get_model("habit")
+    preds, confidences = predict_habit_batch(features, model)
+    version = model.version
+    return [
+        {"predicted_success": pred, "confidence": round(conf, 3), "model_version": version}
+        for pred, conf in zip(preds, confidences)
+    ]
+
+
+def _score_mood(records: list) -> list[dict]:
+    features = MOOD_SPEC.matrix(records)
+    model = get_model("mood")
+    moods, confidences = predict_mood_batch(features, model)
+    version = model.version
+    return [
+        {"predicted_mood": mood, "confidence": round(conf, 3), "model_version": version}
+        for mood, conf in zip(moods, confidences)
+    ]
+
+
+def _score_sleep(records: list) -> list[dict]:
+    features = SLEEP_SPEC.matrix(records)
+    model = get_model("sleep")
+    qualities, confidences = predict_sleep_batch(features, model)
+    version = model.version
+    return [
+        {"predicted_sleep_quality": quality, "confidence": round(conf, 3), "model_version": version}
+        for quality, conf in zip(qualities, confidences)
+    ]
+
+
+def _score_chain(records: list) -> list[dict]:
+    models = get_models()
+    rows = run_chain_batch(records, models)
+    versions = get_model_versions(models)
+    return [{**row, "model_versions": versions} for row in rows]
+
+
+SCORERS = {
+    "habit": _score_habit,
+    "mood": _score_mood,
+    "sleep": _score_sleep,
+    "chain": _score_chain,
+}
+
+
+def score_chunk(model: str, chunk: list) -> bytes:
+    """
+    Scores a chunk of (line_no, record, error_row) tuples with one batched
+    call per model and returns the NDJSON output for it, in input order.
+    """
+    valid = [(line_no, record) for line_no, record, error in chunk if error is None]
+    results = iter(SCORERS[model]([record for _, record in valid])) if valid else iter(())
+
+    rows = []
+    for line_no, record, error in chunk:
+        rows.append(error if error is not None else {"line": line_no, **next(results)})
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def iter_chunks(model: str, lines: Iterable, chunk_size: int) -> Iterator[list]:
+    """Groups non-blank NDJSON lines into parsed chunks of chunk_size."""
+    chunk = []
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record, error = parse_record(model, line_no, line)
+        chunk.append((line_no, record, error))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_lines(model: str, lines: Iterable, chunk_size: int) -> Iterator[bytes]:
+    """Scores an iterable of NDJSON lines, yielding NDJSON output per chunk."""
+    for chunk in iter_chunks(model, lines, chunk_size):
+        yield score_chunk(model, chunk)
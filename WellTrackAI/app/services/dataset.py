@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+PARTITION_PREFIX = "date="
+META_FILE = "_meta.json"
+# Partition the create_*_dummy_data.py scripts write. The dummy data is a
+# fixed snapshot, so re-running them replaces it rather than adding
+# another day's copy of the same rows for train_pipeline to train on
+DUMMY_PARTITION = "2000-01-01"
+
+
+def _compact(series: pd.Series):
+    """
+    Returns (array, meta) in a compact dtype: integers the narrowest int
+    type that holds them losslessly, strings integer codes plus a category
+    list, and floats float32. The float downcast is lossy, but the models
+    cast their input to float32 anyway.
+    """
+    if series.dtype.kind == "f":
+        return series.to_numpy(dtype=np.float32), {"type": "float32"}
+    if series.dtype.kind in "iub":
+        values = series.to_numpy()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            info = np.iinfo(dtype)
+            if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+                return values.astype(dtype), {"type": np.dtype(dtype).name}
+    categories, codes = np.unique(series.astype(str).to_numpy(), return_inverse=True)
+    dtype = np.int8 if len(categories) <= 127 else np.int32
+    return codes.astype(dtype), {"type": "category", "categories": categories.tolist()}
+
+
+def partition_dir(root: str, partition) -> str:
+    key = partition.isoformat() if isinstance(partition, date) else str(partition)
+    return os.path.join(root, f"{PARTITION_PREFIX}{key}")
+
+
+def write_partition(root: str, df: pd.DataFrame, partition, compress: bool = False) -> str:
+    """
+    Writes df as one date partition of the dataset at root, one file per
+    column, replacing any partition with the same date. Uncompressed
+    columns are plain .npy files that read_* can memory-map; compress=True
+    stores zlib-compressed columns instead, which are smaller but are read
+    into memory. Returns the partition directory.
+    """
+    path = partition_dir(root, partition)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = {}
+    for name in df.columns:
+        values, meta = _compact(df[name])
+        file_name = f"{name}.npy.z" if compress else f"{name}.npy"
+        if compress:
+            with open(os.path.join(tmp_path, file_name), "wb") as f:
+                f.write(zlib.compress(values.tobytes(), 6))
+        else:
+            np.save(os.path.join(tmp_path, file_name), values)
+        columns[name] = {**meta, "dtype": values.dtype.name, "file": file_name}
+
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format_version": FORMAT_VERSION, "rows": len(df), "columns": columns}, f)
+
+    # Swap the finished partition in so readers never see half of one
+    if os.path.exists(path):
+        old_path = f"{path}.{os.getpid()}.old"
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
+    return path
+
+
+def list_partitions(root: str, start=None, end=None) -> list[str]:
+    """Partition dates (ISO strings) under root, oldest first, optionally within [start, end]."""
+    if not os.path.isdir(root):
+        return []
+    keys = sorted(
+        name[len(PARTITION_PREFIX):]
+        for name in os.listdir(root)
+        if name.startswith(PARTITION_PREFIX) and os.path.isfile(os.path.join(root, name, META_FILE))
+    )
+    start = start.isoformat() if isinstance(start, date) else start
+    end = end.isoformat() if isinstance(end, date) else end
+    return [k for k in keys if (start is None or k >= start) and (end is None or k <= end)]
+
+
+def is_dataset(path: str) -> bool:
+    return bool(list_partitions(path))
+
+
+def read_partition(root: str, partition, columns=None, mmap: bool = True) -> pd.DataFrame:
+    """
+    Loads one partition, reading only the requested columns. Category
+    columns come back as their string labels.
+    """
+    path = partition_dir(root, partition)
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    data = {}
+    for name in columns or meta["columns"]:
+        column = meta["columns"].get(name)
+        if column is None:
+            raise KeyError(f"Column {name!r} is not in {path}")
+        file_path = os.path.join(path, column["file"])
+        if column["file"].endswith(".z"):
+            with open(file_path, "rb") as f:
+                values = np.frombuffer(zlib.decompress(f.read()), dtype=np.dtype(column["dtype"]))
+        else:
+            values = np.load(file_path, mmap_mode="r" if mmap else None)
+        if column["type"] == "category":
+            values = np.asarray(column["categories"], dtype=object)[values]
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def iter_dataset(root: str, columns=None, start=None, end=None, mmap: bool = True):
+    """Yields one DataFrame per partition, oldest first."""
+    for partition in list_partitions(root, start, end):
+        yield read_partition(root, partition, columns, mmap)
+
+
+def read_dataset(root: str, columns=None, start=None, end=None, mmap: bool = True) -> pd.DataFrame:
+    """Loads the selected columns of every partition in [start, end] into one DataFrame."""
+    frames = list(iter_dataset(root, columns, start, end, mmap))
+    if not frames:
+        raise FileNotFoundError(f"No partitions found under {root}")
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def count_rows(root: str, start=None, end=None) -> int:
+    total = 0
+    for partition in list_partitions(root, start, end):
+        with open(os.path.join(partition_dir(root, partition), META_FILE), encoding="utf-8") as f:
+            total += json.load(f)["rows"]
+    return total
+
+
+def load_frame(root: str, csv_path: str, columns=None, start=None, end=None) -> pd.DataFrame:
+    """
+    Reads the columnar dataset at root, falling back to the CSV export when
+    no partitions have been written yet.
+    """
+    if is_dataset(root):
+        return read_dataset(root, columns, start, end)
+    df = pd.read_csv(csv_path, usecols=columns)
+    return df[list(columns)] if columns else df
@@ -0,0 +1,167 @@
+from operator import attrgetter, itemgetter
+
+import numpy as np
+
+from app.schemas.recommendation import MOOD_VALUE_CODES, SLEEP_QUALITY_CODES
+
+# Column order each model was trained on. Training, serving, synthetic data
+# and the load tests all read these, so they are written down only here.
+HABIT_FEATURES = (
+    "previous_habit_ratio",
+    "sleep_hours",
+    "sleep_quality",
+    "water_liters",
+    "steps_count",
+    "calories",
+    "protein",
+    "carbs",
+    "fat",
+    "mood",
+)
+MOOD_FEATURES = (
+    "sleep_hours",
+    "sleep_quality",
+    "water_liters",
+    "steps_count",
+    "activity_type",
+    "calories",
+    "protein",
+    "carbs",
+    "fat",
+    "habit_completion_ratio",
+)
+SLEEP_FEATURES = (
+    "steps_count",
+    "activity_type",
+    "water_liters",
+    "calories",
+    "protein",
+    "carbs",
+    "fat",
+    "habit_completion_ratio",
+    "mood",
+)
+FEATURES = {"habit": HABIT_FEATURES, "mood": MOOD_FEATURES, "sleep": SLEEP_FEATURES}
+
+# Where each chain input lives on a RecommendationRequest: a field, or a
+# key of one of its nested sections
+CHAIN_SOURCES = {
+    "previous_habit_ratio": "habit.previous_habit_ratio",
+    "sleep_hours": "sleep.hours",
+    "sleep_quality": "sleep.quality",
+    "mood": "mood.value",
+    "activity_type": "mood.activity_type",
+    "water_liters": "water_liters",
+    "steps_count": "steps",
+    "calories": "calories",
+    "protein": "protein",
+    "carbs": "carbs",
+    "fat": "fat",
+}
+CHAIN_INPUT_COLUMNS = tuple(CHAIN_SOURCES)
+# Values for nested keys a request leaves out
+CHAIN_INPUT_DEFAULTS = {
+    "previous_habit_ratio": 0.0,
+    "sleep_hours": 0.0,
+    "sleep_quality": 1.0,
+    "mood": 1.0,
+    "activity_type": 0.0,
+}
+LABEL_CODES = {"sleep_quality": SLEEP_QUALITY_CODES, "mood": MOOD_VALUE_CODES}
+
+
+def _tuple_getter(getter_type, names: list):
+    """attrgetter/itemgetter that always returns a tuple, even for one name."""
+    getter = getter_type(*names)
+    return (lambda obj: (getter(obj),)) if len(names) == 1 else getter
+
+
+class FeatureSpec:
+    """
+    Reads the columns of a model (or of the predict-all chain) straight
+    off validated request objects. Top-level fields come from one
+    attrgetter and each nested section from one itemgetter over its
+    CHAIN_INPUT_DEFAULTS, so a record takes a handful of C-level calls;
+    labels such as "Good" become their codes.
+    """
+
+    def __init__(self, columns: tuple, sources: dict = None):
+        sources = sources or {}
+        self.columns = columns
+
+        fields, sections = [], {}
+        for column in columns:
+            section, _, key = sources.get(column, column).rpartition(".")
+            if section:
+                sections.setdefault(section, []).append((column, key))
+            else:
+                fields.append((column, key))
+
+        # Values are gathered fields first, then section by section, and
+        # put back into column order at the end
+        gathered = [column for column, _ in fields]
+        self._fields = _tuple_getter(attrgetter, [key for _, key in fields]) if fields else None
+        self._sections = []
+        for section, keys in sections.items():
+            defaults = {key: CHAIN_INPUT_DEFAULTS.get(column, 0.0) for column, key in keys}
+            self._sections.append((section, defaults, _tuple_getter(itemgetter, [key for _, key in keys])))
+            gathered.extend(column for column, _ in keys)
+
+        self._labels = [(gathered.index(column), codes) for column, codes in LABEL_CODES.items() if column in gathered]
+        order = [gathered.index(column) for column in columns]
+        self._order = None if order == list(range(len(columns))) else _tuple_getter(itemgetter, order)
+
+    def values(self, record) -> tuple:
+        """The record's values in column order."""
+        values = self._fields(record) if self._fields is not None else ()
+        for section, defaults, getter in self._sections:
+            values += getter({**defaults, **getattr(record, section)})
+        if self._labels:
+            values = list(values)
+            for i, codes in self._labels:
+                values[i] = codes.get(values[i], values[i])
+        return self._order(values) if self._order is not None else values
+
+    def row(self, record) -> np.ndarray:
+        """One float32 model row; models cast their input to float32 anyway."""
+        return np.array(self.values(record), dtype=np.float32)
+
+    def matrix(self, records: list) -> np.ndarray:
+        """The (rows, columns) float32 matrix of records."""
+        values = [self.values(record) for record in records]
+        return np.array(values, dtype=np.float32).reshape(len(records), len(self.columns))
+
+
+class Projection:
+    """
+    Picks one model's columns out of a FeatureSpec's values, plus the
+    values the chain computes on the way, such as upstream confidences.
+    """
+
+    def __init__(self, columns: tuple, source_columns: tuple, computed: tuple = ()):
+        # A computed column shadows a source column of the same name (the
+        # sleep model's "mood" is the mood model's confidence)
+        position = {column: i for i, column in enumerate(tuple(source_columns) + tuple(computed))}
+        self.columns = columns
+        self.computed = computed
+        self._pick = _tuple_getter(itemgetter, [position[column] for column in columns])
+
+    def row(self, values: tuple, *computed) -> np.ndarray:
+        """A float32 row from values plus the computed columns, in self.computed order."""
+        return np.array(self._pick(values + computed), dtype=np.float32)
+
+
+# Single-model requests name their fields after the columns
+HABIT_SPEC = FeatureSpec(HABIT_FEATURES)
+MOOD_SPEC = FeatureSpec(MOOD_FEATURES)
+SLEEP_SPEC = FeatureSpec(SLEEP_FEATURES)
+
+# predict-all reads the chain inputs once per request. The habit model's
+# confidence stands in for the mood and sleep models' completion ratio,
+# and the mood model's confidence for the sleep model's mood
+CHAIN_INPUT_SPEC = FeatureSpec(CHAIN_INPUT_COLUMNS, CHAIN_SOURCES)
+CHAIN_ROWS = {
+    "habit": Projection(HABIT_FEATURES, CHAIN_INPUT_COLUMNS),
+    "mood": Projection(MOOD_FEATURES, CHAIN_INPUT_COLUMNS, computed=("habit_completion_ratio",)),
+    "sleep": Projection(SLEEP_FEATURES, CHAIN_INPUT_COLUMNS, computed=("habit_completion_ratio", "mood")),
+}
@@ -0,0 +1,172 @@
+import numpy as np
+
+# Rows scored per traversal pass; bounds the (rows x trees x classes)
+# leaf-value buffer for large inputs.
+CHUNK_ROWS = 2048
+
+
+def _reachable_nodes(tree, max_depth, min_samples_split):
+    """
+    Walks a fitted sklearn tree level by level, stopping at max_depth and
+    at nodes with fewer than min_samples_split training samples. Returns
+    the ids of the nodes still reachable, in order, and which are leaves.
+    """
+    is_leaf = tree.children_left == -1
+    kept = []
+    frontier = np.array([0])
+    depth = 0
+    while frontier.size:
+        stop = is_leaf[frontier].copy()
+        if max_depth is not None and depth >= max_depth:
+            stop[:] = True
+        if min_samples_split:
+            stop |= tree.n_node_samples[frontier] < min_samples_split
+        is_leaf[frontier] = stop
+        kept.append(frontier)
+        internal = frontier[~stop]
+        frontier = np.concatenate([tree.children_left[internal], tree.children_right[internal]])
+        depth += 1
+    kept = np.sort(np.concatenate(kept))
+    return kept, is_leaf[kept]
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    The largest float32 at or below each threshold. For a float32 x,
+    x <= t exactly when x <= _float32_floor(t).
+    """
+    rounded = threshold.astype(np.float32)
+    over = rounded.astype(np.float64) > threshold
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+
+class FlatForest:
+    """
+    A RandomForestClassifier exported into packed node arrays and scored
+    with vectorized traversal over all trees at once.
+
+    predict_proba matches sklearn exactly: inputs are cast to float32 like
+    sklearn's tree code, per-leaf class fractions are normalized the same
+    way and tree outputs are summed in estimator order before averaging.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, n_features, options=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.n_features = n_features
+        # Export options (see from_sklearn) this forest was built with
+        self.options = options or {}
+        # Digest of the pickle it was compiled from, set by the model registry
+        self.source_digest = None
+        self.is_leaf = left == np.arange(len(left))
+
+    @classmethod
+    def from_sklearn(cls, model, max_trees: int = None, max_depth: int = None,
+                     min_samples_split: int = 0, compact: bool = False) -> "FlatForest":
+        """
+        Exports a fitted forest. With the defaults the result predicts
+        exactly like the model. The options trade accuracy for size:
+        max_trees keeps only the first trees, while max_depth and
+        min_samples_split turn deeper nodes, and nodes that saw fewer
+        training samples, into leaves that predict their class mix.
+        compact stores indices as int32 and values as float32.
+        Thresholds are rounded down to float32, which keeps every split
+        decision the same for float32 inputs.
+        """
+        n_classes = int(model.n_classes_)
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+
+        for estimator in model.estimators_[:max_trees]:
+            tree = estimator.tree_
+            kept, is_leaf = _reachable_nodes(tree, max_depth, min_samples_split)
+            n_nodes = len(kept)
+            new_ids = np.zeros(tree.node_count, dtype=np.intp)
+            new_ids[kept] = np.arange(offset, offset + n_nodes)
+            node_ids = new_ids[kept]
+
+            # Leaves point at themselves, which is how traversal spots them
+            feature.append(np.where(is_leaf, 0, tree.feature[kept]))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold[kept]))
+            left.append(np.where(is_leaf, node_ids, new_ids[tree.children_left[kept]]))
+            right.append(np.where(is_leaf, node_ids, new_ids[tree.children_right[kept]]))
+
+            proba = tree.value[kept, 0, :n_classes].copy()
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            value.append(proba)
+
+            roots.append(offset)
+            offset += n_nodes
+
+        index_type = np.int32 if compact else np.intp
+        threshold = np.concatenate(threshold)
+        if compact:
+            threshold = _float32_floor(threshold)
+        options = {"max_trees": max_trees, "max_depth": max_depth,
+                   "min_samples_split": min_samples_split, "compact": compact}
+        return cls(
+            feature=np.concatenate(feature).astype(index_type),
+            threshold=threshold.astype(np.float32 if compact else np.float64),
+            left=np.concatenate(left).astype(index_type),
+            right=np.concatenate(right).astype(index_type),
+            value=np.concatenate(value).astype(np.float32 if compact else np.float64),
+            roots=np.array(roots, dtype=index_type),
+            n_features=int(model.n_features_in_),
+            options={k: v for k, v in options.items() if v},
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right,
+                                      self.value, self.roots, self.is_leaf))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has shape {X.shape}, but the forest expects {self.n_features} features"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+
+        if len(X) <= CHUNK_ROWS:
+            return self._predict_chunk(X)
+        return np.concatenate([
+            self._predict_chunk(X[start:start + CHUNK_ROWS])
+            for start in range(0, len(X), CHUNK_ROWS)
+        ])
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows = len(X)
+        X_flat = np.ascontiguousarray(X).ravel()
+
+        # One slot per (row, tree); only slots not yet at a leaf are advanced
+        nodes = np.tile(self.roots.astype(np.intp), n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * self.n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+
+        while active.size:
+            current = nodes[active]
+            go_left = X_flat[row_offset[active] + self.feature[current]] <= self.threshold[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[~self.is_leaf[following]]
+
+        # (trees, rows, classes); reducing over the leading axis adds the
+        # trees one after another, the same order sklearn accumulates them
+        leaf_values = self.value[nodes.reshape(n_rows, self.n_trees).T]
+        proba = np.add.reduce(leaf_values, axis=0, dtype=np.float64)
+        proba /= self.n_trees
+        return proba
+
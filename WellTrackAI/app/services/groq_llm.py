@@ -1,21 +1,21 @@
-from groq import Groq
-from app.core.config import GROQ_API_KEY
+import asyncio
+import hashlib
+import re
 
-if not GROQ_API_KEY:
-    raise RuntimeError("GROQ_API_KEY is not set")
+from app.core.config import RECOMMENDATION_CACHE_MAX_ENTRIES, RECOMMENDATION_CACHE_TTL_SECONDS
+from app.services.cache import LRUCache
+from app.services.llm_client import chat_completion, chat_completion_stream
+from app.services.metrics import LLM_HEDGES
 
-client = Groq(api_key=GROQ_API_KEY)
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
 
+LLM_MODEL = "llama-3.1-8b-instant"
 
-def generate_llm_recommendation(context_points: list[str]) -> dict:
-    """
-    Returns:
-    {
-        "summary": "short summary here",
-        "action_items": ["item1", "item2", ...]
-    }
-    """
-    prompt = f"""
+recommendation_cache = LRUCache(RECOMMENDATION_CACHE_MAX_ENTRIES, RECOMMENDATION_CACHE_TTL_SECONDS)
+
+
+def _build_prompt(context_points: list[str]) -> str:
+    return f"""
 You are a health AI assistant.
 
 Based on the following insights:
@@ -27,18 +27,201 @@ Generate:
 - Respond in plain text only, without Markdown symbols or extra headings
 """
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}],
+
+def _clean_line(line: str) -> str:
+    return line.strip().strip("-* ").strip()
+
+
+def _to_recommendation(lines: list[str]) -> dict:
+    summary = lines[0] if lines else "No summary available"
+
+    action_items = lines[1:6]
+
+    return {"summary": summary, "action_items": action_items}
+
+
+async def generate_llm_recommendation(context_points: list[str]) -> dict:
+    """
+    Returns:
+    {
+        "summary": "short summary here",
+        "action_items": ["item1", "item2", ...]
+    }
+    """
+    response = await chat_completion(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": _build_prompt(context_points)}],
         temperature=0.4,
         max_tokens=250
     )
 
-    text = response.choices[0].message.content.strip()
-    lines = [line.strip("-* ").strip() for line in text.splitlines() if line.strip()]
-    
-    summary = lines[0] if lines else "No summary available"
+    text = response.choices[0].message.content
+    lines = [_clean_line(line) for line in text.splitlines() if line.strip()]
+    return _to_recommendation(lines)
 
-    action_items = lines[1:6] 
 
-    return {"summary": summary, "action_items": action_items}
+class LineSplitter:
+    """
+    Splits streamed text into the same cleaned lines that
+    generate_llm_recommendation gets from the whole completion.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Returns the lines completed by this piece of text."""
+        parts = (self._buffer + text).splitlines(keepends=True)
+        # An unterminated last part may still grow
+        self._buffer = parts.pop() if parts and parts[-1] == parts[-1].splitlines()[0] else ""
+        return [_clean_line(part) for part in parts if part.strip()]
+
+    def close(self) -> list[str]:
+        rest, self._buffer = self._buffer, ""
+        return [_clean_line(rest)] if rest.strip() else []
+
+
+async def stream_llm_recommendation(context_points: list[str]):
+    """
+    Yields ("summary", text) and then ("action_item", text) for up to five
+    items, each as soon as its line of the completion is complete. Lines
+    past the fifth item are not read; the stream is closed instead.
+    """
+    splitter = LineSplitter()
+    count = 0
+    chunks = chat_completion_stream(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": _build_prompt(context_points)}],
+        temperature=0.4,
+        max_tokens=250,
+    )
+    try:
+        async for text in chunks:
+            for line in splitter.feed(text):
+                yield ("summary" if count == 0 else "action_item"), line
+                count += 1
+                if count == 6:
+                    return
+        for line in splitter.close():
+            yield ("summary" if count == 0 else "action_item"), line
+            count += 1
+    finally:
+        await chunks.aclose()
+    if count == 0:
+        yield "summary", "No summary available"
+
+
+def _bucket_number(match: re.Match) -> str:
+    value = float(match.group())
+    if value < 1:
+        bucketed = round(value, 1)            # confidences
+    elif value < 10:
+        bucketed = round(value * 2) / 2       # liters
+    elif value < 1000:
+        bucketed = round(value / 10) * 10     # grams
+    else:
+        bucketed = round(value / 500) * 500   # steps
+    return str(int(bucketed)) if float(bucketed).is_integer() else f"{bucketed:g}"
+
+
+def normalize_insights(context_points: list[str]) -> list[str]:
+    """
+    Buckets the numbers inside each insight and sorts the list, so users
+    with near-identical insights share one cache entry.
+    """
+    return sorted({_NUMBER.sub(_bucket_number, point) for point in context_points})
+
+
+def _cache_key(normalized: list[str]) -> str:
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()
+
+
+async def get_llm_recommendation_cached(context_points: list[str]) -> dict:
+    """
+    Returns a cached recommendation for the normalized insights, calling
+    the LLM (with the normalized insights) only on a miss.
+    """
+    normalized = normalize_insights(context_points)
+    key = _cache_key(normalized)
+
+    cached = recommendation_cache.get(key)
+    if cached is None:
+        cached = await generate_llm_recommendation(normalized)
+        recommendation_cache.set(key, cached)
+
+    return {"summary": cached["summary"], "action_items": list(cached["action_items"])}
+
+
+async def get_llm_recommendation_within(context_points: list[str], budget: float, hedge_share: float):
+    """
+    Like get_llm_recommendation_cached, but gives up after `budget`
+    seconds. If the first call has not answered once hedge_share of the
+    budget has passed, an identical hedged call is sent and whichever
+    answers first wins. Returns (recommendation, source) with source
+    "cache", "llm" or "hedge", or (None, None) when every call failed or
+    ran out of time.
+    """
+    normalized = normalize_insights(context_points)
+    key = _cache_key(normalized)
+
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return {"summary": cached["summary"], "action_items": list(cached["action_items"])}, "cache"
+    if budget <= 0:
+        return None, None
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    primary = asyncio.create_task(generate_llm_recommendation(normalized))
+    sources = {primary: "llm"}
+    try:
+        # The first call has hedge_share of the budget to itself
+        done, pending = await asyncio.wait({primary}, timeout=budget * min(1.0, hedge_share))
+        if not done and hedge_share < 1:
+            hedge = asyncio.create_task(generate_llm_recommendation(normalized))
+            sources[hedge] = "hedge"
+            pending.add(hedge)
+            LLM_HEDGES.inc("sent")
+
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    result = task.result()
+                    recommendation_cache.set(key, result)
+                    if sources[task] == "hedge":
+                        LLM_HEDGES.inc("won")
+                    return {"summary": result["summary"], "action_items": list(result["action_items"])}, sources[task]
+            remaining = deadline - loop.time()
+            if not pending or remaining <= 0:
+                return None, None
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Calls that lost or ran out of time are abandoned
+        for task in sources:
+            task.cancel()
+
+
+async def stream_llm_recommendation_cached(context_points: list[str]):
+    """
+    Streaming counterpart of get_llm_recommendation_cached. First yields
+    ("source", "cache" or "llm"); a cache hit is then replayed at once and
+    a miss is streamed from the LLM and cached once the stream has
+    completed.
+    """
+    normalized = normalize_insights(context_points)
+    key = _cache_key(normalized)
+
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        yield "source", "cache"
+        yield "summary", cached["summary"]
+        for item in cached["action_items"]:
+            yield "action_item", item
+        return
+
+    yield "source", "llm"
+    lines = []
+    async for kind, line in stream_llm_recommendation(normalized):
+        lines.append(line)
+        yield kind, line
+    recommendation_cache.set(key, _to_recommendation(lines))
@@ -1,18 +1,57 @@
-import os
-import joblib
 import numpy as np
 
+from app.core.config import MICRO_BATCH_ENABLED, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_QUEUE_SIZE, MICRO_BATCH_WAIT_MS
+from app.services.features import HABIT_FEATURES
+from app.services.inference_pool import run_batched, run_inference
+from app.services.micro_batcher import MicroBatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.model_registry import LoadedModel, get_model
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-MODEL_DIR = os.path.join(BASE_DIR, "models")
 
-MODEL_PATH = os.path.join(MODEL_DIR, "habit_model.pkl")
+habit_batcher = MicroBatcher("habit", MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS, MICRO_BATCH_QUEUE_SIZE)
 
-habit_model = joblib.load(MODEL_PATH)
+habit_cache = PredictionCache("habit", HABIT_FEATURES)
 
-def predict_habit(features: list):
-    features = np.array([features])
-    proba = habit_model.predict_proba(features)[0]
+def _predict_habit_row(model: LoadedModel, features) -> np.ndarray:
+    if MICRO_BATCH_ENABLED:
+        return habit_batcher.predict(model.predict_proba, features)
+    return model.predict_proba(np.array([features]))[0]
+
+async def _await_habit_row(model: LoadedModel, features) -> np.ndarray:
+    return await run_batched(habit_batcher, model.predict_proba, features)
+
+def _habit_result(proba: np.ndarray):
     pred_index = np.argmax(proba)
-    confidence = float(proba[pred_index])
-    return int(pred_index), confidence
+    return int(pred_index), float(proba[pred_index])
+
+def predict_habit(features: list, model: LoadedModel = None):
+    """
+    Scores a single feature row with model, by default the serving
+    version; callers that report the version pass the one they resolved.
+    Returns (prediction, confidence).
+    """
+    model = model or get_model("habit")
+    return _habit_result(habit_cache.predict_row(model, features, _predict_habit_row))
+
+async def predict_habit_async(features: list, model: LoadedModel = None):
+    """
+    predict_habit for the event loop. With the micro-batcher on, the row
+    awaits its batch without holding an inference pool thread; otherwise
+    it is scored on the pool.
+    """
+    model = model or get_model("habit")
+    if not MICRO_BATCH_ENABLED:
+        return await run_inference(predict_habit, features, model)
+    return _habit_result(await habit_cache.predict_row_async(model, features, _await_habit_row))
+
+def predict_habit_batch(features: np.ndarray, model: LoadedModel = None):
+    """
+    Scores a 2-D feature matrix with a single predict_proba call over
+    the rows not already in the prediction cache.
+    Returns (predictions, confidences) as lists.
+    """
+    model = model or get_model("habit")
+    proba = habit_cache.predict_batch(model, features)
+    pred_index = proba.argmax(axis=1)
+    confidence = proba[np.arange(len(proba)), pred_index]
+    return pred_index.tolist(), confidence.tolist()
@@ -0,0 +1,77 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE
+from app.services.metrics import INFERENCE_IN_FLIGHT, INFERENCE_REJECTIONS
+
+_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+# One slot per running or queued job; when none are left the request is
+# rejected straight away instead of waiting behind the backlog.
+_slots = threading.BoundedSemaphore(INFERENCE_WORKERS + INFERENCE_QUEUE_SIZE)
+
+
+# How often a waiting caller checks for a free slot
+SLOT_POLL_SECONDS = 0.005
+
+
+async def run_inference(fn, *args, wait: bool = False):
+    """
+    Runs a blocking model call on the inference pool.
+    Raises a 503 when the pool and its queue are full, unless `wait` is
+    set: streaming responses that have already sent their headers wait
+    for a slot instead, since a 503 can no longer reach the client.
+    """
+    while not _slots.acquire(blocking=False):
+        if not wait:
+            raise _capacity_exhausted()
+        # Polled rather than blocking a thread on the semaphore, so a
+        # disconnecting client cancels the wait without leaking a slot
+        await asyncio.sleep(SLOT_POLL_SECONDS)
+
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+
+    INFERENCE_IN_FLIGHT.inc()
+    # Released when the job finishes or is cancelled before it starts,
+    # so a disconnected client never leaks a slot.
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def run_batched(batcher, predict_fn, features):
+    """
+    Queues one row on a MicroBatcher and awaits its probability row on
+    the event loop, so waiting for the batch holds no pool thread.
+    Raises a 503 when the batcher's queue is full.
+    """
+    try:
+        future = batcher.submit(predict_fn, features, block=False)
+    except queue.Full:
+        raise _capacity_exhausted() from None
+    return await asyncio.wrap_future(future)
+
+
+def _capacity_exhausted() -> HTTPException:
+    INFERENCE_REJECTIONS.inc()
+    return HTTPException(
+        status_code=503,
+        detail="Inference capacity exhausted, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _release(_):
+    INFERENCE_IN_FLIGHT.dec()
+    _slots.release()
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
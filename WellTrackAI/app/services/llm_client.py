@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+
+import httpx
+from groq import AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
+
+from app.core.config import (
+    GROQ_API_KEY,
+    GROQ_BASE_URL,
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+)
+from app.services.metrics import LLM_ERRORS, LLM_IN_FLIGHT, LLM_LATENCY, LLM_REQUESTS, LLM_TOKENS
+
+if not GROQ_API_KEY:
+    raise RuntimeError("GROQ_API_KEY is not set")
+
+# APIConnectionError also covers APITimeoutError
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+_client = None
+_semaphore = None
+
+
+def get_client() -> AsyncGroq:
+    """
+    Returns the process-wide AsyncGroq client, created on first use so
+    its connection pool is bound to the running event loop.
+    """
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            ),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+        _client = AsyncGroq(
+            api_key=GROQ_API_KEY,
+            base_url=GROQ_BASE_URL,
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=0,  # retries are handled below with our own budget
+            http_client=http_client,
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def _backoff(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+async def chat_completion(**kwargs):
+    """
+    Calls chat.completions.create with a per-call timeout, at most
+    LLM_MAX_RETRIES retries on transient errors and a cap on how many
+    calls are in flight at once.
+    """
+    client = get_client()
+    model = kwargs.get("model", "")
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with _get_semaphore():
+                with LLM_IN_FLIGHT.track(), LLM_LATENCY.time(model):
+                    response = await client.chat.completions.create(
+                        timeout=LLM_TIMEOUT_SECONDS, **kwargs
+                    )
+            _record_usage(model, response)
+            return response
+        except RETRYABLE_ERRORS as exc:
+            LLM_ERRORS.inc(model, type(exc).__name__)
+            if attempt == LLM_MAX_RETRIES:
+                LLM_REQUESTS.inc(model, "error")
+                raise
+        except Exception as exc:
+            LLM_ERRORS.inc(model, type(exc).__name__)
+            LLM_REQUESTS.inc(model, "error")
+            raise
+        await asyncio.sleep(_backoff(attempt))
+
+
+async def chat_completion_stream(**kwargs):
+    """
+    Streaming counterpart of chat_completion: yields the completion's
+    content deltas as they arrive. Transient errors are retried only
+    until the first chunk, since a retry after that would repeat text
+    the caller has already consumed.
+    """
+    client = get_client()
+    model = kwargs.get("model", "")
+    semaphore = _get_semaphore()
+    started = time.perf_counter()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        # Held for the whole stream, released before each backoff
+        await semaphore.acquire()
+        try:
+            stream = await client.chat.completions.create(
+                timeout=LLM_TIMEOUT_SECONDS, stream=True, **kwargs
+            )
+            break
+        except RETRYABLE_ERRORS as exc:
+            semaphore.release()
+            LLM_ERRORS.inc(model, type(exc).__name__)
+            if attempt == LLM_MAX_RETRIES:
+                LLM_REQUESTS.inc(model, "error")
+                raise
+        except Exception as exc:
+            semaphore.release()
+            LLM_ERRORS.inc(model, type(exc).__name__)
+            LLM_REQUESTS.inc(model, "error")
+            raise
+        except BaseException:
+            # Cancelled while the stream was being opened (client
+            # disconnect or a deadline): the permit is still ours
+            semaphore.release()
+            raise
+        await asyncio.sleep(_backoff(attempt))
+
+    usage_source = None
+    # Stays "closed" when the caller stops reading early (aclose() or
+    # cancellation), which skips the code after the loop
+    outcome = "closed"
+    try:
+        with LLM_IN_FLIGHT.track():
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                # Groq reports usage on the last chunk, under x_groq
+                if getattr(chunk, "usage", None) is not None:
+                    usage_source = chunk
+                elif getattr(getattr(chunk, "x_groq", None), "usage", None) is not None:
+                    usage_source = chunk.x_groq
+        outcome = "ok"
+    except Exception as exc:
+        outcome = "error"
+        LLM_ERRORS.inc(model, type(exc).__name__)
+        raise
+    finally:
+        try:
+            await stream.close()
+        finally:
+            semaphore.release()
+        if outcome == "error":
+            LLM_REQUESTS.inc(model, "error")
+        else:
+            # A closed stream never reaches the usage chunk, so only its
+            # request and latency are recorded
+            LLM_LATENCY.observe(time.perf_counter() - started, model)
+            _record_usage(model, usage_source, outcome)
+
+
+def _record_usage(model: str, response, outcome: str = "ok"):
+    LLM_REQUESTS.inc(model, outcome)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.inc(model, "prompt", amount=usage.prompt_tokens or 0)
+        LLM_TOKENS.inc(model, "completion", amount=usage.completion_tokens or 0)
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,213 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from app.core.config import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, labels: tuple) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """
+    Recording only updates a few numbers under a lock; the text format is
+    built when /metrics is scraped, so unscraped metrics cost next to nothing.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in series
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels):
+        """Counts the block as in flight while it runs."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observes how long the block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            )
+
+        lines = self._header()
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(bucket_labelnames, labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency.", ("route", "method"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_EXCEPTIONS = Counter("http_exceptions_total", "Unhandled exceptions raised by routes.", ("route", "exception"))
+
+STAGE_LATENCY = Histogram("stage_duration_seconds", "Latency of each predict-all stage.", ("stage",))
+
+MODEL_INFERENCES = Counter("model_inference_total", "predict_proba calls per model.", ("model",))
+MODEL_ROWS = Counter("model_inference_rows_total", "Rows scored per model.", ("model",))
+MODEL_BATCH_SIZE = Histogram("model_batch_size", "Rows per predict_proba call.", ("model",), BATCH_SIZE_BUCKETS)
+MODEL_LATENCY = Histogram("model_inference_duration_seconds", "predict_proba latency.", ("model",))
+MODEL_VERSION = Gauge("model_version_info", "1 for the model version being served, 0 for retired ones.", ("model", "version"))
+MODEL_RELOADS = Counter("model_reloads_total", "Model version loads by outcome.", ("model", "outcome"))
+SHADOW_ROWS = Counter(
+    "shadow_rows_total", "Rows re-scored by the shadow candidate, by agreement with the serving model.",
+    ("model", "outcome"),
+)
+SHADOW_DROPPED = Counter("shadow_dropped_total", "Sampled shadow batches dropped because the queue was full.", ("model",))
+SHADOW_LATENCY = Histogram("shadow_inference_duration_seconds", "Shadow candidate predict_proba latency.", ("model",))
+
+INFERENCE_IN_FLIGHT = Gauge("inference_jobs_in_flight", "Jobs running or queued on the inference pool.")
+INFERENCE_REJECTIONS = Counter("inference_rejections_total", "Jobs rejected because the inference pool was full.")
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "LLM calls by model and outcome; \"closed\" is a stream the caller stopped reading early.",
+    ("model", "outcome"),
+)
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Latency of one LLM call attempt.", ("model",))
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "LLM calls currently awaiting a response.")
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used by LLM calls.", ("model", "kind"))
+LLM_ERRORS = Counter("llm_errors_total", "Failed LLM call attempts by error type.", ("model", "error"))
+LLM_HEDGES = Counter("llm_hedges_total", "Hedged duplicate LLM calls: sent, and won when the hedge answered first.", ("outcome",))
+RECOMMENDATION_SOURCE = Counter(
+    "recommendation_source_total", "predict-all recommendations by the path that produced them.", ("source",)
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and in-flight count per
+    route. Routes are labelled by their path template, so the label set
+    stays small.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            HTTP_EXCEPTIONS.inc(_route(scope), type(exc).__name__)
+            raise
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = _route(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - start, route, scope["method"])
+            HTTP_REQUESTS.inc(route, scope["method"], str(status))
+
+
+def _route(scope) -> str:
+    # Recent FastAPI versions match included routers lazily, so scope["route"]
+    # lacks the router prefix; the full template is on the effective context
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
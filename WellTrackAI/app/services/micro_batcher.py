@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class MicroBatcher:
+    """
+    Collects single-row predictions that arrive concurrently (up to
+    max_batch_size rows) and scores them with one batched predict_fn
+    call. Each caller passes the predict_fn of the model version it
+    resolved, so rows of different versions are never scored together,
+    and gets its own row of the result through a Future, which async
+    callers await with asyncio.wrap_future. At most max_queue rows wait
+    (0 for no limit).
+    """
+
+    def __init__(self, name: str, max_batch_size: int, max_wait_ms: float, max_queue: int = 0):
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue(max_queue)
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._batch_size_hist = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_hist = [0] * (len(WAIT_MS_BUCKETS) + 1)
+
+    def submit(self, predict_fn, features, block: bool = True) -> Future:
+        """
+        Queues one row and returns the Future its probability row is set
+        on. Unless block is set, a full queue raises queue.Full.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((predict_fn, features, future, time.perf_counter()), block=block)
+        return future
+
+    def predict(self, predict_fn, features) -> np.ndarray:
+        """Blocks until the batch containing this row has been scored."""
+        return self.submit(predict_fn, features).result()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=f"{self.name}-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self) -> list:
+        """
+        Takes the next row plus whatever is already queued behind it. A
+        lone row is dispatched at once; batches form from rows that pile up
+        while the previous batch is being scored. A max_wait above zero
+        additionally lingers for more rows, but only when others are
+        already waiting, so a lone request never pays it.
+        """
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if len(batch) == 1 or self.max_wait <= 0:
+            return batch
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Only a hot swap puts rows of two model versions in one batch
+            groups = {}
+            for item in self._collect():
+                groups.setdefault(item[0], []).append(item)
+            for predict_fn, batch in groups.items():
+                self._score(predict_fn, batch)
+
+    def _score(self, predict_fn, batch: list):
+        # Rows whose caller stopped waiting (a cancelled await) are dropped
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self._record(batch, time.perf_counter())
+        try:
+            features = np.array([item[1] for item in batch], dtype=float)
+            proba = predict_fn(features)
+        except Exception as exc:
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+
+        for row, (_, _, future, _) in zip(proba, batch):
+            future.set_result(row)
+
+    def _record(self, batch: list, dispatched_at: float):
+        waits = [(dispatched_at - enqueued_at) * 1000 for _, _, _, enqueued_at in batch]
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_size_hist[_bucket(len(batch), BATCH_SIZE_BUCKETS)] += 1
+            for wait in waits:
+                self._wait_total_ms += wait
+                self._wait_max_ms = max(self._wait_max_ms, wait)
+                self._wait_hist[_bucket(wait, WAIT_MS_BUCKETS)] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": round(self._requests / self._batches, 3) if self._batches else 0.0,
+                "avg_wait_ms": round(self._wait_total_ms / self._requests, 3) if self._requests else 0.0,
+                "max_wait_ms_observed": round(self._wait_max_ms, 3),
+                "batch_size_histogram": _histogram(self._batch_size_hist, BATCH_SIZE_BUCKETS),
+                "wait_ms_histogram": _histogram(self._wait_hist, WAIT_MS_BUCKETS),
+            }
+
+
+def _bucket(value: float, bounds: tuple) -> int:
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def _histogram(counts: list, bounds: tuple) -> dict:
+    labels = [f"le_{bound}" for bound in bounds] + ["le_inf"]
+    return dict(zip(labels, counts))
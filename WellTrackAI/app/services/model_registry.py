@@ -0,0 +1,554 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+
+from app.core.config import (
+    INFERENCE_BACKEND,
+    FLAT_FOREST_MAX_ROWS,
+    MODEL_MMAP,
+    MODEL_RELOAD_INTERVAL_S,
+    MODEL_VARIANT,
+    SHADOW_MODEL_DIR,
+    SHADOW_QUEUE_SIZE,
+    SHADOW_SAMPLE_RATE,
+)
+from app.services.forest_engine import FlatForest
+from app.services.metrics import (
+    MODEL_BATCH_SIZE,
+    MODEL_INFERENCES,
+    MODEL_LATENCY,
+    MODEL_RELOADS,
+    MODEL_ROWS,
+    MODEL_VERSION,
+)
+from app.services.shadow_scoring import ShadowScorer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+COMPILED_DIR = os.path.join(MODEL_DIR, "compiled")
+
+MODEL_FILES = {
+    "habit": "habit_model.pkl",
+    "mood": "mood_model.pkl",
+    "sleep": "sleep_model.pkl",
+}
+LABEL_ENCODER_FILE = "mood_label_encoder.pkl"
+
+# Versions kept per model in the /models history
+HISTORY_SIZE = 10
+
+_lock = threading.RLock()
+# Held for each whole check-load-swap-prune sequence, by the watcher and
+# POST /models/reload alike; it also guards _digests and the label files
+_reload_lock = threading.Lock()
+_sklearn_models = {}
+_digests = {}
+_loaded = {}
+_candidates = {}
+_history = {}
+_last_errors = {}
+_ready = False
+_watcher = None
+_stop_watching = threading.Event()
+
+shadow = ShadowScorer(SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE)
+
+
+class LoadedModel:
+    """
+    One version of a model: its predict_proba callable, the mood labels it
+    predicts, and the artifacts it was loaded from. A new version replaces
+    the whole object, so a caller holding one always scores with a
+    consistent model even while a reload swaps in the next.
+    """
+
+    def __init__(self, name: str, version: str, predict_proba, n_features: int,
+                 labels: np.ndarray = None, paths: list = (), signature: tuple = ()):
+        self.name = name
+        self.version = version
+        self.predict_proba = predict_proba
+        self.n_features = n_features
+        self.labels = labels
+        self.paths = list(paths)
+        self.signature = signature
+        self.loaded_at = time.time()
+
+    def label_of(self, proba: np.ndarray) -> np.ndarray:
+        """The predicted class of each row, as a mood label when the model has them."""
+        index = proba.argmax(axis=1)
+        return self.labels[index] if self.labels is not None else index
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "artifacts": [os.path.relpath(path, BASE_DIR) for path in self.paths],
+            "loaded_at": round(self.loaded_at, 3),
+        }
+
+
+def _model_path(name: str) -> str:
+    return os.path.join(MODEL_DIR, MODEL_FILES[name])
+
+
+def _compiled_path(name: str, variant: str = "") -> str:
+    suffix = f"_{variant}" if variant else ""
+    return os.path.join(COMPILED_DIR, f"{name}_flat{suffix}.joblib")
+
+
+def _signature(paths: list) -> tuple:
+    """Cheap change detector: (path, mtime, size) of each artifact."""
+    entries = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            entries.append((path, None, None))
+        else:
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def _digest(paths: list) -> str:
+    """
+    Content hash of the artifacts, so every worker and host serving the
+    same files reports the same version. Each file is hashed once per
+    (mtime, size).
+    """
+    combined = hashlib.sha256()
+    for path, mtime_ns, size in _signature(paths):
+        key = (path, mtime_ns, size)
+        digest = _digests.get(key)
+        if digest is None:
+            file_hash = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    file_hash.update(block)
+            digest = _digests[key] = file_hash.hexdigest()
+        combined.update(digest.encode())
+    return combined.hexdigest()[:12]
+
+
+def get_sklearn_model(name: str):
+    """Unpickles the sklearn forest, again whenever the pickle changes."""
+    signature = _signature([_model_path(name)])
+    entry = _sklearn_models.get(name)
+    if entry is None or entry[1] != signature:
+        with _lock:
+            entry = _sklearn_models.get(name)
+            if entry is None or entry[1] != signature:
+                entry = (joblib.load(_model_path(name)), signature)
+                _sklearn_models[name] = entry
+    return entry[0]
+
+
+def compile_model(name: str, variant: str = "", **options) -> str:
+    """
+    Exports the pickled forest to an uncompressed joblib file of flat node
+    arrays, which can be loaded with mmap_mode. A named variant is built
+    with FlatForest.from_sklearn options. Returns the artifact path.
+    """
+    source_digest = _digest([_model_path(name)])
+    forest = FlatForest.from_sklearn(get_sklearn_model(name), **options)
+    forest.source_digest = source_digest
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    path = _compiled_path(name, variant)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(forest, tmp_path)
+    # Replacing rather than rewriting keeps memory maps of the old file valid
+    os.replace(tmp_path, path)
+    return path
+
+
+def _is_stale(name: str, variant: str = "") -> bool:
+    """
+    Whether the compiled forest is missing or was compiled from another
+    pickle than the one on disk. Compared by content, since a copy or
+    checkout can give a new pickle an older mtime than the artifact.
+    """
+    path = _compiled_path(name, variant)
+    if not os.path.exists(path):
+        return True
+    compiled = joblib.load(path, mmap_mode="r")
+    return getattr(compiled, "source_digest", None) != _digest([_model_path(name)])
+
+
+def _rebuild_variant(name: str, variant: str):
+    path = _compiled_path(name, variant)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} does not exist; export the {variant!r} variant with train/export_models.py"
+        )
+    # The stale artifact records the options it was exported with
+    compile_model(name, variant, **joblib.load(path, mmap_mode="r").options)
+    _sklearn_models.pop(name, None)
+
+
+def _load_mood_labels(encoder_path: str) -> np.ndarray:
+    """
+    The label encoder's classes_, indexed by class id. They are cached as
+    a .npy file next to the compiled forests so serving never has to
+    import sklearn.
+    """
+    labels_path = _labels_path(_digest([encoder_path]))
+    try:
+        return np.load(labels_path)
+    except FileNotFoundError:
+        # First load of this encoder, or pruned by another worker
+        pass
+    labels = joblib.load(encoder_path).classes_.astype(str)
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    tmp_path = f"{labels_path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, labels)
+    os.replace(tmp_path, labels_path)
+    return labels
+
+
+def _labels_path(digest: str) -> str:
+    return os.path.join(COMPILED_DIR, f"mood_labels_{digest}.npy")
+
+
+def _prune_retired():
+    """
+    Forgets what only retired versions used: cached digests of artifacts
+    that have since been replaced, and the label files of encoders no
+    longer on disk. Loaded versions keep their labels in memory. Called
+    with _reload_lock held, so no load is reading what it removes.
+    """
+    for key in list(_digests):
+        if _signature([key[0]])[0] != key:
+            del _digests[key]
+
+    encoders = [os.path.join(MODEL_DIR, LABEL_ENCODER_FILE)]
+    candidate = _candidates.get("mood")
+    if candidate is not None:
+        encoders.append(candidate.paths[1])
+    keep = set()
+    for path in encoders:
+        try:
+            keep.add(os.path.basename(_labels_path(_digest([path]))))
+        except OSError:
+            pass
+    try:
+        names = os.listdir(COMPILED_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith("mood_labels_") and name.endswith(".npy") and name not in keep:
+            try:
+                os.remove(os.path.join(COMPILED_DIR, name))
+            except OSError:
+                pass
+
+
+def _source_paths(name: str) -> list:
+    """Files whose change means a new version of name should be loaded."""
+    paths = [_model_path(name)]
+    if INFERENCE_BACKEND == "flat" and MODEL_VARIANT:
+        paths.append(_compiled_path(name, MODEL_VARIANT))
+    if name == "mood":
+        paths.append(os.path.join(MODEL_DIR, LABEL_ENCODER_FILE))
+    return paths
+
+
+def _version_paths(name: str) -> list:
+    """Files whose content identifies the version being served."""
+    paths = [_compiled_path(name, MODEL_VARIANT) if INFERENCE_BACKEND == "flat" and MODEL_VARIANT
+             else _model_path(name)]
+    if name == "mood":
+        paths.append(os.path.join(MODEL_DIR, LABEL_ENCODER_FILE))
+    return paths
+
+
+def _build_predictor(name: str):
+    """Returns (predict_proba, n_features) for the configured INFERENCE_BACKEND."""
+    if INFERENCE_BACKEND == "sklearn":
+        model = get_sklearn_model(name)
+        return model.predict_proba, int(model.n_features_in_)
+    if INFERENCE_BACKEND != "flat":
+        raise ValueError(f"Unknown INFERENCE_BACKEND: {INFERENCE_BACKEND}")
+
+    forest = joblib.load(_compiled_path(name, MODEL_VARIANT), mmap_mode="r" if MODEL_MMAP else None)
+    if MODEL_VARIANT:
+        return forest.predict_proba, forest.n_features
+
+    def predict_proba(X):
+        # sklearn's compiled traversal wins on large batches; the pickle
+        # is only loaded the first time such a batch arrives
+        if len(X) > FLAT_FOREST_MAX_ROWS:
+            return get_sklearn_model(name).predict_proba(X)
+        return forest.predict_proba(X)
+
+    return predict_proba, forest.n_features
+
+
+def _instrument(model: LoadedModel, predictor):
+    name = model.name
+
+    def predict_proba(X):
+        with MODEL_LATENCY.time(name):
+            proba = predictor(X)
+        MODEL_INFERENCES.inc(name)
+        MODEL_ROWS.inc(name, amount=len(X))
+        MODEL_BATCH_SIZE.observe(len(X), name)
+        shadow.offer(name, X, proba, model)
+        return proba
+
+    return predict_proba
+
+
+def _load(name: str) -> LoadedModel:
+    """
+    Loads the current artifacts of name and runs one prediction through
+    them. With the flat backend a compiled forest that is missing or was
+    compiled from another pickle (the MODEL_VARIANT export when one is
+    set) is rebuilt first; with MODEL_MMAP its node arrays are read-only
+    memory maps shared by every worker on the host.
+    """
+    if INFERENCE_BACKEND == "flat" and _is_stale(name, MODEL_VARIANT):
+        if MODEL_VARIANT:
+            _rebuild_variant(name, MODEL_VARIANT)
+        else:
+            compile_model(name)
+
+    # Taken before reading, so a file replaced mid-load triggers another reload
+    signature = _signature(_source_paths(name))
+    version = _digest(_version_paths(name))
+    predictor, n_features = _build_predictor(name)
+    labels = _load_mood_labels(os.path.join(MODEL_DIR, LABEL_ENCODER_FILE)) if name == "mood" else None
+
+    model = LoadedModel(name, version, None, n_features, labels, _version_paths(name), signature)
+    predictor(np.zeros((1, n_features)))
+    model.predict_proba = _instrument(model, predictor)
+    return model
+
+
+def _swap(model: LoadedModel):
+    with _lock:
+        previous = _loaded.get(model.name)
+        # A single dict assignment: requests already holding the previous
+        # version finish with it, new ones get this one
+        _loaded[model.name] = model
+        _history.setdefault(model.name, deque(maxlen=HISTORY_SIZE)).append(model.info())
+    MODEL_VERSION.inc(model.name, model.version)
+    if previous is not None:
+        MODEL_VERSION.dec(previous.name, previous.version)
+
+
+def check_for_update(name: str) -> bool:
+    """
+    Loads and swaps in a new version of name if its artifacts changed.
+    A failed load leaves the serving version in place and is retried on
+    the next check. Returns whether a new version was swapped in.
+    """
+    current = _loaded.get(name)
+    if current is not None and current.signature == _signature(_source_paths(name)):
+        return False
+
+    with _reload_lock:
+        current = _loaded.get(name)
+        if current is not None and current.signature == _signature(_source_paths(name)):
+            return False
+        try:
+            model = _load(name)
+        except Exception as exc:
+            MODEL_RELOADS.inc(name, "failed")
+            _last_errors[name] = f"{type(exc).__name__}: {exc}"
+            if current is None:
+                raise
+            return False
+        _last_errors.pop(name, None)
+
+        if current is not None and model.version == current.version:
+            # Touched or re-copied, but the same content
+            current.signature = model.signature
+            return False
+        _swap(model)
+        MODEL_RELOADS.inc(name, "loaded")
+        if current is not None:
+            _prune_retired()
+        return True
+
+
+def _candidate_paths(name: str) -> list:
+    paths = [os.path.join(SHADOW_MODEL_DIR, MODEL_FILES[name])]
+    if name == "mood":
+        encoder_path = os.path.join(SHADOW_MODEL_DIR, LABEL_ENCODER_FILE)
+        paths.append(encoder_path if os.path.exists(encoder_path) else os.path.join(MODEL_DIR, LABEL_ENCODER_FILE))
+    return paths
+
+
+def check_shadow_candidate(name: str) -> bool:
+    """
+    Loads the SHADOW_MODEL_DIR candidate for name, or a changed one, and
+    hands it to the shadow scorer. Candidates are kept in memory as exact
+    flat forests (or sklearn models with that backend) and never serve
+    responses. Returns whether the candidate changed.
+    """
+    if not SHADOW_MODEL_DIR:
+        return False
+
+    with _reload_lock:
+        paths = _candidate_paths(name)
+        signature = _signature(paths)
+        current = _candidates.get(name)
+        if current is not None and current.signature == signature:
+            return False
+        if not os.path.exists(paths[0]):
+            if current is None:
+                return False
+            del _candidates[name]
+            shadow.set_candidate(name, None)
+            _prune_retired()
+            return True
+
+        try:
+            model = joblib.load(paths[0])
+            labels = _load_mood_labels(paths[1]) if name == "mood" else None
+            predictor = model.predict_proba if INFERENCE_BACKEND == "sklearn" else FlatForest.from_sklearn(model).predict_proba
+            candidate = LoadedModel(name, _digest(paths), predictor, int(model.n_features_in_), labels, paths, signature)
+        except Exception as exc:
+            MODEL_RELOADS.inc(f"{name}_shadow", "failed")
+            _last_errors[f"{name}_shadow"] = f"{type(exc).__name__}: {exc}"
+            return False
+        _last_errors.pop(f"{name}_shadow", None)
+        _candidates[name] = candidate
+        shadow.set_candidate(name, candidate)
+        if current is not None:
+            _prune_retired()
+        return True
+
+
+def reload_models() -> dict:
+    """Checks every model (and shadow candidate) once; returns {name: swapped}."""
+    changed = {}
+    for name in MODEL_FILES:
+        changed[name] = check_for_update(name)
+        check_shadow_candidate(name)
+    return changed
+
+
+def _watch(interval: float):
+    while not _stop_watching.wait(interval):
+        for name in MODEL_FILES:
+            try:
+                check_for_update(name)
+                check_shadow_candidate(name)
+            except Exception:
+                # Already counted; keep watching the other models
+                pass
+
+
+def start_watcher(interval: float = MODEL_RELOAD_INTERVAL_S):
+    """Starts the background reload thread (no-op when interval <= 0)."""
+    global _watcher
+    if interval <= 0 or _watcher is not None:
+        return
+    _stop_watching.clear()
+    _watcher = threading.Thread(target=_watch, args=(interval,), name="model-watcher", daemon=True)
+    _watcher.start()
+
+
+def stop_watcher():
+    global _watcher
+    _stop_watching.set()
+    _watcher = None
+
+
+def get_model(name: str) -> LoadedModel:
+    """
+    The version of name currently being served, loading it on first use.
+    A request resolves it once and takes predict_proba, labels and version
+    from that object, so a concurrent hot swap cannot mix two versions.
+    """
+    model = _loaded.get(name)
+    if model is None:
+        check_for_update(name)
+        model = _loaded[name]
+    return model
+
+
+def get_predictor(name: str):
+    """
+    Returns the predict_proba callable of the serving version of name for
+    the configured INFERENCE_BACKEND. Callers that score many batches
+    should fetch it per batch so hot reloads take effect.
+    """
+    return get_model(name).predict_proba
+
+
+def get_model_version(name: str) -> str:
+    """
+    Content hash of the artifacts the serving version came from; responses,
+    caches and metrics use it to tell model versions apart.
+    """
+    return get_model(name).version
+
+
+def get_models() -> dict:
+    """The serving version of every model, resolved together for one request."""
+    return {name: get_model(name) for name in MODEL_FILES}
+
+
+def get_model_versions(models: dict = None) -> dict:
+    """Versions of models (from get_models), or of the serving versions."""
+    return {name: model.version for name, model in (models or get_models()).items()}
+
+
+def get_mood_labels() -> np.ndarray:
+    """
+    The serving mood model's label encoder classes_, indexed by class id.
+    For offline tools; requests take labels from the LoadedModel they score with.
+    """
+    return get_model("mood").labels
+
+
+def status() -> dict:
+    """Serving version, recent versions and last load error per model, plus shadow stats."""
+    return {
+        "models": {
+            name: {
+                "serving": model.info(),
+                "history": list(_history.get(name, ())),
+                "last_error": _last_errors.get(name),
+            }
+            for name, model in list(_loaded.items())
+        },
+        "shadow": {
+            **shadow.stats(),
+            "errors": {name: error for name, error in _last_errors.items() if name.endswith("_shadow")},
+        },
+        "reload_interval_s": MODEL_RELOAD_INTERVAL_S,
+    }
+
+
+def warm_up():
+    """
+    Loads every model (and shadow candidate) and runs one prediction
+    through it, so the first request does not pay the load cost.
+    """
+    global _ready
+    for name in MODEL_FILES:
+        get_model(name)
+        check_shadow_candidate(name)
+    _ready = True
+
+
+def mark_ready():
+    """Reports ready without warming up, for MODEL_WARMUP=false."""
+    global _ready
+    _ready = True
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+if __name__ == "__main__":
+    for model_name in MODEL_FILES:
+        print("Compiled", compile_model(model_name))
+    print("Mood labels", _load_mood_labels(os.path.join(MODEL_DIR, LABEL_ENCODER_FILE)).tolist())
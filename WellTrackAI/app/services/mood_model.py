@@ -1,9 +1,65 @@
-import joblib
-import os
+import numpy as np
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-MODEL_DIR = os.path.join(BASE_DIR, "models")
+from app.core.config import MICRO_BATCH_ENABLED, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_QUEUE_SIZE, MICRO_BATCH_WAIT_MS
+from app.services.features import MOOD_FEATURES
+from app.services.inference_pool import run_batched, run_inference
+from app.services.micro_batcher import MicroBatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.model_registry import LoadedModel, get_model
 
-mood_model = joblib.load(os.path.join(MODEL_DIR, "mood_model.pkl"))
-mood_label_encoder = joblib.load(os.path.join(MODEL_DIR, "mood_label_encoder.pkl"))
 
+mood_batcher = MicroBatcher("mood", MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS, MICRO_BATCH_QUEUE_SIZE)
+
+mood_cache = PredictionCache("mood", MOOD_FEATURES)
+
+
+def _predict_mood_row(model: LoadedModel, features) -> np.ndarray:
+    if MICRO_BATCH_ENABLED:
+        return mood_batcher.predict(model.predict_proba, features)
+    return model.predict_proba(np.array([features]))[0]
+
+
+async def _await_mood_row(model: LoadedModel, features) -> np.ndarray:
+    return await run_batched(mood_batcher, model.predict_proba, features)
+
+
+def _mood_result(model: LoadedModel, proba: np.ndarray):
+    pred_index = int(np.argmax(proba))
+    return str(model.labels[pred_index]), float(proba[pred_index])
+
+
+def predict_mood(features: list, model: LoadedModel = None):
+    """
+    Scores a single feature row. Concurrent callers are merged into one
+    predict_proba call by the micro-batcher when it is enabled, and
+    repeated rows are answered from the prediction cache. model defaults
+    to the serving version; its probabilities and labels always come from
+    the same one. Returns (mood, confidence).
+    """
+    model = model or get_model("mood")
+    return _mood_result(model, mood_cache.predict_row(model, features, _predict_mood_row))
+
+
+async def predict_mood_async(features: list, model: LoadedModel = None):
+    """
+    predict_mood for the event loop. With the micro-batcher on, the row
+    awaits its batch without holding an inference pool thread; otherwise
+    it is scored on the pool.
+    """
+    model = model or get_model("mood")
+    if not MICRO_BATCH_ENABLED:
+        return await run_inference(predict_mood, features, model)
+    return _mood_result(model, await mood_cache.predict_row_async(model, features, _await_mood_row))
+
+
+def predict_mood_batch(features: np.ndarray, model: LoadedModel = None):
+    """
+    Scores a 2-D feature matrix with a single predict_proba call over
+    the rows not already in the prediction cache.
+    Returns (moods, confidences) as lists.
+    """
+    model = model or get_model("mood")
+    proba = mood_cache.predict_batch(model, features)
+    moods = model.label_of(proba)
+    confidence = proba.max(axis=1)
+    return moods.tolist(), confidence.tolist()
@@ -1,11 +1,20 @@
-from groq import Groq
-from app.core.config import GROQ_API_KEY
+import asyncio
+import json
+import logging
+import os
 from datetime import date
+from app.core.config import MOTIVATION_CACHE_DIR
+from app.services.llm_client import chat_completion
 
-client = Groq(api_key=GROQ_API_KEY)
+logger = logging.getLogger(__name__)
 
+# Only today's message is kept; an entry for an older date is dropped as
+# soon as the next day's message is stored, so the cache expires at midnight.
+_cache: dict[date, str] = {}
+_pending: dict[date, asyncio.Task] = {}
 
-def generate_daily_motivation(for_date: date) -> str:
+
+async def generate_daily_motivation(for_date: date) -> str:
     """
     Generates a short daily motivational message.
     """
@@ -26,7 +35,7 @@ Example tone:
 "Small steps today lead to big wins tomorrow. Stay consistent 💪"
 """
 
-    response = client.chat.completions.create(
+    response = await chat_completion(
         model="llama-3.1-8b-instant",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.6,
@@ -34,3 +43,79 @@ Example tone:
     )
 
     return response.choices[0].message.content.strip()
+
+
+async def get_daily_motivation_cached(for_date: date) -> str:
+    """
+    Returns the motivational message for the given date, calling the LLM
+    at most once per date. Concurrent cache misses share a single call.
+    """
+    message = _cache.get(for_date)
+    if message is not None:
+        return message
+
+    task = _pending.get(for_date)
+    if task is None:
+        task = asyncio.ensure_future(_load_daily_motivation(for_date))
+        _pending[for_date] = task
+        task.add_done_callback(lambda _: _pending.pop(for_date, None))
+
+    # Shielded so a disconnecting client does not cancel the shared call
+    return await asyncio.shield(task)
+
+
+async def _load_daily_motivation(for_date: date) -> str:
+    message = None
+    if MOTIVATION_CACHE_DIR:
+        message = await asyncio.to_thread(_read_from_disk, for_date)
+
+    if message is None:
+        message = await generate_daily_motivation(for_date)
+        if MOTIVATION_CACHE_DIR:
+            await asyncio.to_thread(_write_to_disk, for_date, message)
+
+    _cache.clear()
+    _cache[for_date] = message
+    return message
+
+
+def _cache_path(for_date: date) -> str:
+    return os.path.join(MOTIVATION_CACHE_DIR, f"motivation_{for_date.isoformat()}.json")
+
+
+def _read_from_disk(for_date: date):
+    try:
+        with open(_cache_path(for_date), encoding="utf-8") as f:
+            return json.load(f)["message"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_to_disk(for_date: date, message: str):
+    """
+    Best effort: a read-only or full cache directory only costs the
+    persistence, the message is still cached in memory and returned.
+    """
+    path = _cache_path(for_date)
+    # Per-process temp name, so workers writing at once do not collide
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(MOTIVATION_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"date": for_date.isoformat(), "message": message}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not persist the daily motivation to %s: %s", path, exc)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+
+    # Older days are never served again
+    for name in os.listdir(MOTIVATION_CACHE_DIR):
+        if name.startswith("motivation_") and name.endswith(".json") and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(MOTIVATION_CACHE_DIR, name))
+            except OSError:
+                pass
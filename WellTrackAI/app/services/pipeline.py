@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import COHORT_CHUNK_SIZE, COHORT_WORKERS
+from app.schemas.recommendation import RecommendationRequest
+from app.services.features import (
+    CHAIN_INPUT_COLUMNS,
+    CHAIN_INPUT_DEFAULTS,
+    CHAIN_INPUT_SPEC,
+    LABEL_CODES,
+    HABIT_FEATURES,
+    MOOD_FEATURES,
+    SLEEP_FEATURES,
+)
+from app.services.model_registry import get_models
+from app.services.sleep_model import SLEEP_LABELS
+
+SLEEP_LABEL_ARRAY = np.array([SLEEP_LABELS[i] for i in sorted(SLEEP_LABELS)])
+
+COHORT_RESULT_COLUMNS = (
+    "habit_predicted_success",
+    "habit_confidence",
+    "predicted_mood",
+    "mood_confidence",
+    "predicted_sleep_quality",
+    "sleep_confidence",
+)
+
+
+def _column(data, name: str, n_rows: int) -> np.ndarray:
+    if name not in data:
+        if name not in CHAIN_INPUT_DEFAULTS:
+            raise ValueError(f"Missing required column: {name}")
+        return np.full(n_rows, CHAIN_INPUT_DEFAULTS[name])
+
+    values = np.asarray(data[name])
+    if values.dtype.kind not in "OUS":
+        return values.astype(float)
+
+    # Label columns ("Good", "Happy", ...) map to codes like predict_all
+    codes = LABEL_CODES.get(name, {})
+    default = CHAIN_INPUT_DEFAULTS.get(name, 0.0)
+    if values.dtype.kind in "US":
+        unique, inverse = np.unique(values, return_inverse=True)
+        return np.array([codes.get(label, default) for label in unique], dtype=float)[inverse]
+    return np.array(
+        [codes.get(v, default) if isinstance(v, str) else v for v in values], dtype=float
+    )
+
+
+def _top_class(proba: np.ndarray):
+    index = proba.argmax(axis=1)
+    confidence = np.round(proba[np.arange(len(proba)), index], 3)
+    return index, confidence
+
+
+def run_cascade(columns: dict, models: dict) -> dict:
+    """
+    Runs the habit -> mood -> sleep chain of predict_all over columns of
+    chain inputs, one vectorized predict_proba call per model of models
+    (from get_models). Returns a dict of result columns.
+    """
+    habit_X = np.column_stack([columns[f] for f in HABIT_FEATURES])
+    habit_index, habit_conf = _top_class(models["habit"].predict_proba(habit_X))
+
+    # The habit model's confidence stands in for the completion ratio
+    mood_X = np.column_stack([
+        habit_conf if f == "habit_completion_ratio" else columns[f] for f in MOOD_FEATURES
+    ])
+    mood_index, mood_conf = _top_class(models["mood"].predict_proba(mood_X))
+
+    # Both upstream confidences feed the sleep model
+    sleep_X = np.column_stack([
+        habit_conf if f == "habit_completion_ratio" else mood_conf if f == "mood" else columns[f]
+        for f in SLEEP_FEATURES
+    ])
+    sleep_index, sleep_conf = _top_class(models["sleep"].predict_proba(sleep_X))
+
+    return {
+        "habit_predicted_success": habit_index,
+        "habit_confidence": habit_conf,
+        "predicted_mood": models["mood"].labels[mood_index],
+        "mood_confidence": mood_conf,
+        "predicted_sleep_quality": SLEEP_LABEL_ARRAY[sleep_index],
+        "sleep_confidence": sleep_conf,
+    }
+
+
+def score_cohort(data, chunk_size: int = COHORT_CHUNK_SIZE, workers: int = COHORT_WORKERS):
+    """
+    Scores a whole cohort through the model chain with rules and LLM off.
+
+    data is a pandas DataFrame or a dict of equal-length arrays with the
+    CHAIN_INPUT_COLUMNS; previous_habit_ratio, sleep_hours, sleep_quality,
+    mood and activity_type are optional and default like predict_all.
+    sleep_quality and mood may hold codes or labels such as "Good"/"Happy".
+    Chunks are scored on up to `workers` threads; sklearn's tree traversal
+    releases the GIL, so this scales with cores. Every chunk uses the
+    model versions serving when the call started.
+    Returns the result columns in the same container type as the input.
+    """
+    n_rows = len(data) if isinstance(data, pd.DataFrame) else len(next(iter(data.values())))
+    columns = {name: _column(data, name, n_rows) for name in CHAIN_INPUT_COLUMNS}
+
+    chunks = [
+        {name: values[start:start + chunk_size] for name, values in columns.items()}
+        for start in range(0, n_rows, chunk_size)
+    ]
+    cascade = partial(run_cascade, models=get_models())
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(cascade, chunks))
+    else:
+        parts = [cascade(chunk) for chunk in chunks]
+    result = {
+        name: np.concatenate([part[name] for part in parts]) if parts else np.array([])
+        for name in COHORT_RESULT_COLUMNS
+    }
+
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index)
+    return result
+
+
+def run_chain_batch(records: list[RecommendationRequest], models: dict) -> list[dict]:
+    """
+    Runs the predict_all model chain over many requests with models (from
+    get_models), one batched prediction per model.
+    """
+    X = CHAIN_INPUT_SPEC.matrix(records)
+    columns = {name: X[:, i] for i, name in enumerate(CHAIN_INPUT_COLUMNS)}
+    result = {name: values.tolist() for name, values in run_cascade(columns, models).items()}
+
+    return [
+        {
+            "habit": {"predicted_success": pred, "confidence": habit_conf},
+            "mood": {"predicted_mood": mood, "confidence": mood_conf},
+            "sleep": {"predicted_sleep_quality": sleep, "confidence": sleep_conf},
+        }
+        for pred, habit_conf, mood, mood_conf, sleep, sleep_conf in zip(*result.values())
+    ]
@@ -0,0 +1,129 @@
+import hashlib
+import sys
+
+import numpy as np
+
+from app.core.config import (
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_MAX_BYTES,
+    PREDICTION_CACHE_ROUNDING,
+)
+from app.services.cache import LRUCache
+from app.services.model_registry import get_model_version
+
+
+def _entry_size(key: bytes, value: np.ndarray) -> int:
+    # Key, probability row and the OrderedDict slot holding them
+    return sys.getsizeof(key) + sys.getsizeof(value) + 100
+
+
+class PredictionCache:
+    """
+    LRU cache of predict_proba rows for one model, keyed on a hash of the
+    feature vector. Features listed in PREDICTION_CACHE_ROUNDING are
+    rounded before hashing, so nearly identical inputs share an entry.
+    The cache follows the serving model version and is cleared as soon
+    as it changes; requests still holding an older version bypass it.
+    """
+
+    def __init__(self, name: str, features: tuple, rounding: dict = PREDICTION_CACHE_ROUNDING):
+        self.name = name
+        self.features = features
+        self.cache = LRUCache(
+            PREDICTION_CACHE_MAX_ENTRIES,
+            max_bytes=PREDICTION_CACHE_MAX_BYTES,
+            sizeof=_entry_size,
+        )
+        self.decimals = [rounding.get(feature) for feature in features]
+        self.rounded = any(d is not None for d in self.decimals)
+        self.version = None
+        self.invalidations = 0
+
+    def _keys(self, X: np.ndarray) -> list[bytes]:
+        if self.rounded:
+            X = X.copy()
+            for j, decimals in enumerate(self.decimals):
+                if decimals is not None:
+                    X[:, j] = np.round(X[:, j], decimals)
+        # -0.0 and 0.0 hash alike
+        X = X + 0.0
+        return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in X]
+
+    def _serves(self, version: str) -> bool:
+        """
+        Moves the cache to the serving version, clearing it on a change.
+        Returns whether `version`, the one the caller scores with, is it.
+        """
+        current = get_model_version(self.name)
+        if current != self.version:
+            if self.version is not None:
+                self.cache.clear()
+                self.invalidations += 1
+            self.version = current
+        return version == current
+
+    def _lookup(self, model, features) -> tuple:
+        """(key, cached row) of features; the key is None when model bypasses the cache."""
+        if not PREDICTION_CACHE_ENABLED or not self._serves(model.version):
+            return None, None
+        key = self._keys(np.asarray([features], dtype=float))[0]
+        return key, self.cache.get(key)
+
+    def _store(self, model, key, proba) -> np.ndarray:
+        if key is None:
+            return proba
+        # Copied so a cached row never pins a whole batch's array
+        proba = np.array(proba)
+        if get_model_version(self.name) == model.version:
+            self.cache.set(key, proba)
+        return proba
+
+    def predict_row(self, model, features, predict_row_fn) -> np.ndarray:
+        """
+        Returns the cached probability row of model (a LoadedModel),
+        computing it with predict_row_fn(model, features) on a miss.
+        """
+        key, proba = self._lookup(model, features)
+        if proba is None:
+            proba = self._store(model, key, predict_row_fn(model, features))
+        return proba
+
+    async def predict_row_async(self, model, features, predict_row_fn) -> np.ndarray:
+        """predict_row for a coroutine predict_row_fn, such as one awaiting the micro-batcher."""
+        key, proba = self._lookup(model, features)
+        if proba is None:
+            proba = self._store(model, key, await predict_row_fn(model, features))
+        return proba
+
+    def predict_batch(self, model, X: np.ndarray) -> np.ndarray:
+        """Scores only the rows that miss, with one model.predict_proba call."""
+        if not PREDICTION_CACHE_ENABLED or not self._serves(model.version):
+            return model.predict_proba(X)
+
+        X = np.asarray(X, dtype=float)
+        keys = self._keys(X)
+        rows = [self.cache.get(key) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+
+        if missing:
+            computed = model.predict_proba(X[missing])
+            # Rows scored while a new version was swapped in are not kept
+            store = get_model_version(self.name) == model.version
+            for i, proba in zip(missing, computed):
+                rows[i] = proba.copy()
+                if store:
+                    self.cache.set(keys[i], rows[i])
+        return np.array(rows)
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "model_version": self.version,
+            "invalidations": self.invalidations,
+            "rounding": {
+                feature: decimals
+                for feature, decimals in zip(self.features, self.decimals)
+                if decimals is not None
+            },
+        }
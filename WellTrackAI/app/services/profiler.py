@@ -0,0 +1,301 @@
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from app.core.config import (
+    PROFILING_ADMIN_TOKEN,
+    PROFILING_ENABLED,
+    PROFILING_SAMPLE_RATE,
+    PROFILING_SLOW_MS,
+    PROFILING_INTERVAL_MS,
+    PROFILING_BUFFER_SIZE,
+    PROFILING_HISTORY_S,
+)
+
+# Leaf frames of threads that are parked, not working
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),  # ThreadPoolExecutor worker blocked on its queue
+}
+_THREAD_SUFFIX = re.compile(r"[_-]\d+$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame, thread_name: str):
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(_THREAD_SUFFIX.sub("", thread_name))
+    return ";".join(reversed(labels))
+
+
+class RequestProfile:
+    """Stack samples collected while one request was in flight."""
+
+    def __init__(self, profile_id: int, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.reason = ""
+        self.samples = 0
+        self.stacks = Counter()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "reason": self.reason,
+            "samples": self.samples,
+        }
+
+
+class Profiler:
+    """
+    Wall-clock stack sampler. While at least one profiled request is in
+    flight, a background thread snapshots every thread's stack each
+    interval and adds the collapsed stacks to each active profile.
+    Kept profiles go to a ring buffer of the last `buffer_size`.
+
+    Requests are profiled when they ask for it (X-Profile), fall in the
+    sample_rate share, or take longer than slow_ms. The last is only
+    known once they finish, so with slow_ms set the thread samples all
+    the time and keeps the last `history_s` seconds of snapshots; a slow
+    request's profile is cut from that history (its most recent
+    history_s when it ran longer).
+
+    Samples are not attributed to requests: the event loop, inference
+    pool and micro-batchers are shared, so a profile also holds the
+    stacks of whatever else was in flight with it. Profiles are exact
+    only for requests that ran alone, e.g. X-Profile requests sent to an
+    otherwise idle worker.
+    """
+
+    def __init__(self, enabled: bool, sample_rate: float, slow_ms: float, interval_ms: float, buffer_size: int,
+                 history_s: float = 10.0):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval = interval_ms / 1000.0
+        self.profiles = deque(maxlen=buffer_size)
+        # (perf_counter, stacks) of each snapshot taken while watching for slow requests
+        self.history_s = history_s
+        self._history = deque(maxlen=max(1, int(history_s / self.interval)))
+        # One shared string per distinct stack, so the history holds references
+        self._stack_strings = {}
+
+        self._ids = itertools.count(1)
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def configure(self, enabled: bool = None, sample_rate: float = None, slow_ms: float = None):
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if enabled is not None:
+            self.enabled = enabled
+        with self._lock:
+            self._update_wake()
+        if self._watching_slow():
+            self._ensure_thread()
+
+    def _watching_slow(self) -> bool:
+        return self.enabled and self.slow_ms > 0
+
+    def _update_wake(self):
+        # Called with _lock held
+        if self._active or self._watching_slow():
+            self._wake.set()
+        else:
+            self._wake.clear()
+            self._history.clear()
+
+    def settings(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval * 1000,
+            "history_s": self.history_s,
+            "buffer_size": self.profiles.maxlen,
+            "buffered": len(self.profiles),
+        }
+
+    def start(self, method: str, path: str, requested: bool = False):
+        """
+        Starts profiling a request that asked for it (X-Profile) or falls
+        in the sample. Returns the profile, or None when the request is
+        not profiled up front (finish_unprofiled may still keep it).
+        """
+        if self._watching_slow():
+            self._ensure_thread()
+        if requested:
+            reason = "requested"
+        elif random.random() < self.sample_rate:
+            reason = "sampled"
+        else:
+            return None
+
+        self._ensure_thread()
+        profile = RequestProfile(next(self._ids), method, path)
+        profile.reason = reason
+        with self._lock:
+            self._active.add(profile)
+            self._update_wake()
+        return profile
+
+    def finish(self, profile: RequestProfile, duration_ms: float):
+        with self._lock:
+            self._active.discard(profile)
+            self._update_wake()
+        profile.duration_ms = duration_ms
+        self.profiles.append(profile)
+
+    def finish_unprofiled(self, method: str, path: str, started: float, duration_ms: float):
+        """
+        Keeps a request that was not profiled up front (started is its
+        perf_counter start) if it took at least slow_ms, with the stacks
+        sampled while it ran.
+        """
+        if not self._watching_slow() or duration_ms < self.slow_ms:
+            return
+        ended = started + duration_ms / 1000
+        profile = RequestProfile(next(self._ids), method, path)
+        profile.started_at = time.time() - (time.perf_counter() - started)
+        profile.duration_ms = duration_ms
+        profile.reason = "slow"
+        with self._lock:
+            for taken_at, stacks in reversed(self._history):
+                if taken_at < started:
+                    break
+                if taken_at <= ended:
+                    profile.samples += 1
+                    profile.stacks.update(stacks)
+        self.profiles.append(profile)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+
+            with self._lock:
+                active = list(self._active)
+            watching_slow = self._watching_slow()
+            if not active and not watching_slow:
+                continue
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = _collapse(frame, names.get(ident, "thread"))
+                if stack is not None:
+                    stacks.append(self._stack_strings.setdefault(stack, stack))
+
+            # Under the lock so a profile is never updated after finish()
+            with self._lock:
+                if watching_slow:
+                    self._history.append((time.perf_counter(), stacks))
+                for profile in active:
+                    if profile in self._active:
+                        profile.samples += 1
+                        profile.stacks.update(stacks)
+
+    def get(self, profile_id: int):
+        for profile in list(self.profiles):
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def collapsed(self, profiles=None) -> str:
+        """
+        Merges profiles into collapsed-stack text ("frame;frame;frame count"
+        per line), ready for flamegraph.pl or speedscope.
+        """
+        merged = Counter()
+        for profile in self.profiles if profiles is None else profiles:
+            merged.update(profile.stacks)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(merged.items()))
+
+    def clear(self):
+        self.profiles.clear()
+
+
+profiler = Profiler(
+    PROFILING_ENABLED,
+    PROFILING_SAMPLE_RATE,
+    PROFILING_SLOW_MS,
+    PROFILING_INTERVAL_MS,
+    PROFILING_BUFFER_SIZE,
+    PROFILING_HISTORY_S,
+)
+
+
+def _requested(scope) -> bool:
+    """True when the request sends PROFILING_ADMIN_TOKEN in an X-Profile header."""
+    if not PROFILING_ADMIN_TOKEN:
+        return False
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1") == PROFILING_ADMIN_TOKEN
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that hands sampled and X-Profile requests to the
+    profiler, and the duration of every other request so slow ones can
+    be kept. When profiling is off it costs one attribute check per
+    request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start(scope["method"], scope["path"], _requested(scope))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if profile is not None:
+                profiler.finish(profile, duration_ms)
+            else:
+                profiler.finish_unprofiled(scope["method"], scope["path"], start, duration_ms)
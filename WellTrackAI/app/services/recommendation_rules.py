@@ -1,35 +1,211 @@
-def generate_rule_based_context(data: dict) -> list[str]:
-    insights = []
+import json
+import operator
+import os
+
+import numpy as np
+
+from app.core.config import RULE_SET_PATH, RULE_SET_VERSION
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RULES_DIR = os.path.join(BASE_DIR, "rules")
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class Rule:
+    """
+    One insight: fires when `field <op> value` holds. The message is
+    formatted with the record's fields, e.g. "({water_liters}L)". The
+    optional action is the advice used when the LLM is unavailable.
+    """
+
+    def __init__(self, code: str, field: str, op: str, value, message: str, default=None, action=None):
+        if op != "in" and op not in OPERATORS:
+            raise ValueError(f"Rule {code}: unknown operator {op!r}")
+        self.code = code
+        self.field = field
+        self.op = op
+        self.value = tuple(value) if op == "in" else value
+        self.message = message
+        self.default = default
+        self.action = action
+
+    def check(self, values):
+        """
+        Works on a scalar (returns bool) or on a NumPy array (returns a
+        boolean array), so one rule serves both paths.
+        """
+        if self.op == "in":
+            if isinstance(values, np.ndarray):
+                return np.isin(values, self.value)
+            return values in self.value
+        return OPERATORS[self.op](values, self.value)
+
+
+class RuleSet:
+    """
+    An ordered, versioned table of rules. Rule order is the order of the
+    insights handed to the LLM and of the columns of evaluate()'s matrix.
+    """
+
+    def __init__(self, version: str, rules: list[Rule]):
+        codes = [rule.code for rule in rules]
+        if len(set(codes)) != len(codes):
+            raise ValueError(f"Rule set {version} has duplicate rule codes")
+        self.version = version
+        self.rules = rules
+        self.codes = tuple(codes)
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec["version"], [Rule(**rule) for rule in spec["rules"]])
 
+    def _value(self, record: dict, rule: Rule):
+        value = record.get(rule.field, rule.default)
+        if value is None:
+            raise KeyError(f"Rule {rule.code} needs field {rule.field!r}")
+        return value
+
+    def fired(self, record: dict) -> list[Rule]:
+        """Checks one flat record and returns the rules that fire, in order."""
+        return [rule for rule in self.rules if rule.check(self._value(record, rule))]
+
+    def messages(self, record: dict) -> list[str]:
+        return [rule.message.format(**record) for rule in self.fired(record)]
+
+    def evaluate(self, columns) -> np.ndarray:
+        """
+        Checks every rule against columns (a DataFrame or a dict of
+        equal-length arrays) in one vectorized pass per rule.
+        Returns an (n_rows, n_rules) boolean matrix ordered like `codes`.
+        """
+        n_rows = len(columns) if hasattr(columns, "columns") else len(next(iter(columns.values())))
+        matrix = np.empty((n_rows, len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            if rule.field in columns:
+                values = np.asarray(columns[rule.field])
+            elif rule.default is not None:
+                values = np.full(n_rows, rule.default)
+            else:
+                raise KeyError(f"Rule {rule.code} needs column {rule.field!r}")
+            matrix[:, j] = rule.check(values)
+        return matrix
+
+
+# The fields rule_context provides; a rule on any other field would
+# silently see only its default
+RULE_FIELDS = (
+    "habit_confidence",
+    "predicted_mood",
+    "predicted_sleep_quality",
+    "sleep_confidence",
+    "steps_count",
+    "water_liters",
+    "calories",
+    "protein",
+    "carbs",
+    "fat",
+)
+
+
+def load_rule_set(version: str = RULE_SET_VERSION, path: str = RULE_SET_PATH) -> RuleSet:
+    """Loads rules/recommendation_rules_<version>.json, or `path` when given."""
+    rule_set = RuleSet.from_file(path or os.path.join(RULES_DIR, f"recommendation_rules_{version}.json"))
+    unknown = sorted({rule.field for rule in rule_set.rules} - set(RULE_FIELDS))
+    if unknown:
+        raise ValueError(f"Rule set {rule_set.version} uses unknown fields: {', '.join(unknown)}")
+    return rule_set
+
+
+# Parsed once at import; the per-request and bulk paths share it
+RULE_SET = load_rule_set()
+
+
+def rule_context(data: dict) -> dict:
+    """Flattens predict_all's model results and inputs into rule fields."""
     habit = data["habit"]
     mood = data["mood"]
     sleep = data["sleep"]
+    return {
+        "habit_confidence": habit["confidence"],
+        "predicted_mood": mood["predicted_mood"],
+        "predicted_sleep_quality": sleep["predicted_sleep_quality"],
+        "sleep_confidence": sleep.get("confidence", 0),
+        "steps_count": data["steps"],
+        "water_liters": data["water_liters"],
+        "calories": data["calories"],
+        "protein": data["protein"],
+        "carbs": data["carbs"],
+        "fat": data["fat"],
+    }
+
 
-    if habit["confidence"] < 0.4:
-        insights.append("Your habit success probability is low tomorrow")
+def generate_rule_based_context(data: dict) -> list[str]:
+    return RULE_SET.messages(rule_context(data))
 
-    if sleep["predicted_sleep_quality"] == "Poor":
-        insights.append(f"Your predicted sleep quality is poor ({sleep.get('confidence',0):.2f} confidence)")
 
-    if sleep.get("steps_count", 0) < 5000:
-        insights.append("Your daily steps are low, which may affect energy levels")
+def evaluate_insights(columns) -> np.ndarray:
+    """
+    Bulk counterpart of generate_rule_based_context over cohort columns,
+    such as score_cohort's results joined with its inputs.
+    Returns a boolean matrix whose columns follow RULE_SET.codes.
+    """
+    return RULE_SET.evaluate(columns)
 
-    if mood["predicted_mood"] in ["Sad", "Angry"]:
-        insights.append(f"Mood is negative: {mood['predicted_mood']}")
 
-    if data["water_liters"] < 2:
-        insights.append(f"Water intake is low ({data['water_liters']}L)")
+def insight_messages(columns) -> list[list[str]]:
+    """
+    Per-row generate_rule_based_context over cohort columns: the rules are
+    checked in one vectorized pass and only the messages that fire are
+    formatted.
+    """
+    matrix = RULE_SET.evaluate(columns)
+    values = {name: np.asarray(columns[name]).tolist() for name in columns}
+    messages = []
+    for i, row in enumerate(matrix):
+        fired = np.flatnonzero(row)
+        if not len(fired):
+            messages.append([])
+            continue
+        record = {name: column[i] for name, column in values.items()}
+        messages.append([RULE_SET.rules[j].message.format(**record) for j in fired])
+    return messages
 
-    if data["protein"] < 60:
-        insights.append(f"Protein intake is insufficient ({data['protein']}g)")
 
-    if data["carbs"] > 350:
-        insights.append(f"High carbohydrate intake ({data['carbs']}g) — may affect energy and mood")
+# Padding for the rule-based recommendation, which like the LLM's has at
+# least three action items
+DEFAULT_ACTIONS = (
+    "Keep a consistent bedtime and wake-up time",
+    "Drink water steadily through the day",
+    "Take a short walk after one of your meals",
+)
 
-    if data["fat"] > 100:
-        insights.append(f"High fat intake ({data['fat']}g) — consider lighter meals")
 
-    if data["steps"] < 5000:
-        insights.append(f"Daily steps are low ({data['steps']}) — try to move more")
+def generate_rule_based_recommendation(data: dict) -> dict:
+    """
+    A deterministic stand-in for the LLM recommendation, built from the
+    same insights: the actions of the rules that fire, padded with
+    general advice. Used when the LLM misses its deadline.
+    """
+    fired = RULE_SET.fired(rule_context(data))
+    action_items = []
+    for action in [rule.action for rule in fired if rule.action] + list(DEFAULT_ACTIONS):
+        if action not in action_items:
+            action_items.append(action)
+    n_items = max(3, min(5, len(fired)))
 
-    return insights
+    if fired:
+        areas = "area" if len(fired) == 1 else "areas"
+        summary = f"Based on today's data, {len(fired)} {areas} could use some attention tomorrow."
+    else:
+        summary = "Your predictions look balanced for tomorrow, so keep up your current routine."
+    return {"summary": summary, "action_items": action_items[:n_items]}
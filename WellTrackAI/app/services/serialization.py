@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is the fallback
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """
+    Compact UTF-8 JSON. Uses orjson when it is installed, which is several
+    times faster than the json module and encodes NumPy values natively.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with dumps(). Routes that build their own
+    response dicts return it directly, which also skips FastAPI's
+    response_model validation pass; response_model still documents them.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
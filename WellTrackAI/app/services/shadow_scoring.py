@@ -0,0 +1,109 @@
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from app.services.metrics import SHADOW_DROPPED, SHADOW_LATENCY, SHADOW_ROWS
+
+# Rows of a sampled batch that are copied and re-scored
+MAX_SHADOW_ROWS = 256
+
+
+def _empty_stats() -> dict:
+    return {"rows": 0, "agreed": 0, "abs_diff_total": 0.0, "dropped": 0, "errors": 0}
+
+
+class ShadowScorer:
+    """
+    Re-scores a sample of live predict_proba calls with candidate models on
+    a background thread and tracks how often they agree with the serving
+    model. offer() only rolls the sample and enqueues a copy, and drops the
+    sample when the queue is full, so the request path never waits on a
+    candidate.
+    """
+
+    def __init__(self, sample_rate: float, queue_size: int):
+        self.sample_rate = sample_rate
+        self.candidates = {}
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    def set_candidate(self, name: str, candidate):
+        """Starts (or, with None, stops) shadowing name with candidate."""
+        if candidate is None:
+            self.candidates.pop(name, None)
+        else:
+            self.candidates[name] = candidate
+        with self._stats_lock:
+            self._stats[name] = _empty_stats()
+
+    def offer(self, name: str, X: np.ndarray, proba: np.ndarray, primary):
+        candidate = self.candidates.get(name)
+        if candidate is None or random.random() >= self.sample_rate:
+            return
+        self._ensure_worker()
+        item = (name, candidate, primary, np.array(X[:MAX_SHADOW_ROWS]), np.array(proba[:MAX_SHADOW_ROWS]))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            SHADOW_DROPPED.inc(name)
+            self._add(name, dropped=1)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            name, candidate, primary, X, proba = self._queue.get()
+            try:
+                started = time.perf_counter()
+                shadow_proba = candidate.predict_proba(X)
+                SHADOW_LATENCY.observe(time.perf_counter() - started, name)
+            except Exception:
+                self._add(name, errors=1)
+                continue
+
+            # Compared as class labels, so a candidate whose encoder orders
+            # the classes differently is still judged fairly
+            agreed = int((primary.label_of(proba) == candidate.label_of(shadow_proba)).sum())
+            rows = len(X)
+            SHADOW_ROWS.inc(name, "agree", amount=agreed)
+            SHADOW_ROWS.inc(name, "disagree", amount=rows - agreed)
+            abs_diff = 0.0
+            if shadow_proba.shape == proba.shape:
+                abs_diff = float(np.abs(shadow_proba - proba).max(axis=1).sum())
+            self._add(name, rows=rows, agreed=agreed, abs_diff_total=abs_diff)
+
+    def _add(self, name: str, **amounts):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, _empty_stats())
+            for key, amount in amounts.items():
+                stats[key] += amount
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            snapshot = {name: dict(stats) for name, stats in self._stats.items()}
+        result = {}
+        for name, candidate in list(self.candidates.items()):
+            stats = snapshot.get(name) or _empty_stats()
+            rows = stats["rows"]
+            result[name] = {
+                "candidate_version": candidate.version,
+                "rows": rows,
+                "agreement": round(stats["agreed"] / rows, 4) if rows else None,
+                "mean_max_abs_diff": round(stats["abs_diff_total"] / rows, 4) if rows else None,
+                "dropped": stats["dropped"],
+                "errors": stats["errors"],
+                "queued": self._queue.qsize(),
+            }
+        return {"sample_rate": self.sample_rate, "models": result}
@@ -1,10 +1,12 @@
-import joblib
-import os
+import numpy as np
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-MODEL_DIR = os.path.join(BASE_DIR, "models")
+from app.core.config import MICRO_BATCH_ENABLED, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_QUEUE_SIZE, MICRO_BATCH_WAIT_MS
+from app.services.features import SLEEP_FEATURES
+from app.services.inference_pool import run_batched, run_inference
+from app.services.micro_batcher import MicroBatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.model_registry import LoadedModel, get_model
 
-sleep_model = joblib.load(os.path.join(MODEL_DIR, "sleep_model.pkl"))
 
 SLEEP_LABELS = {
     0: "Poor",
@@ -12,3 +14,60 @@ SLEEP_LABELS = {
     2: "Good"
 }
 
+
+sleep_batcher = MicroBatcher("sleep", MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS, MICRO_BATCH_QUEUE_SIZE)
+
+sleep_cache = PredictionCache("sleep", SLEEP_FEATURES)
+
+
+def _predict_sleep_row(model: LoadedModel, features) -> np.ndarray:
+    if MICRO_BATCH_ENABLED:
+        return sleep_batcher.predict(model.predict_proba, features)
+    return model.predict_proba(np.array([features]))[0]
+
+
+async def _await_sleep_row(model: LoadedModel, features) -> np.ndarray:
+    return await run_batched(sleep_batcher, model.predict_proba, features)
+
+
+def _sleep_result(proba: np.ndarray):
+    pred_index = int(np.argmax(proba))
+    return SLEEP_LABELS[pred_index], float(proba[pred_index])
+
+
+def predict_sleep(features: list, model: LoadedModel = None):
+    """
+    Scores a single feature row with model, by default the serving
+    version. Concurrent callers are merged into one predict_proba call
+    by the micro-batcher when it is enabled, and repeated rows are
+    answered from the prediction cache.
+    Returns (sleep_quality, confidence).
+    """
+    model = model or get_model("sleep")
+    return _sleep_result(sleep_cache.predict_row(model, features, _predict_sleep_row))
+
+
+async def predict_sleep_async(features: list, model: LoadedModel = None):
+    """
+    predict_sleep for the event loop. With the micro-batcher on, the row
+    awaits its batch without holding an inference pool thread; otherwise
+    it is scored on the pool.
+    """
+    model = model or get_model("sleep")
+    if not MICRO_BATCH_ENABLED:
+        return await run_inference(predict_sleep, features, model)
+    return _sleep_result(await sleep_cache.predict_row_async(model, features, _await_sleep_row))
+
+
+def predict_sleep_batch(features: np.ndarray, model: LoadedModel = None):
+    """
+    Scores a 2-D feature matrix with a single predict_proba call over
+    the rows not already in the prediction cache.
+    Returns (qualities, confidences) as lists.
+    """
+    model = model or get_model("sleep")
+    proba = sleep_cache.predict_batch(model, features)
+    pred_index = proba.argmax(axis=1)
+    qualities = [SLEEP_LABELS[int(i)] for i in pred_index]
+    confidence = proba[np.arange(len(proba)), pred_index]
+    return qualities, confidence.tolist()
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from app.services.features import FEATURES
+
+# Per-class feature ranges of create_habit_dummy_data.py, create_mood_dummy_data.py
+# and create_sleep_dummy_data.py, drawn with NumPy. Each *_block returns a
+# float matrix whose columns follow the model's *_FEATURES order, plus the
+# class code as the last column.
+
+MOOD_CLASSES = ("Happy", "Relaxed", "Neutral", "Sad", "Angry")
+
+TARGETS = {"habit": "habit_success", "mood": "mood", "sleep": "sleep_quality"}
+INTEGER_COLUMNS = {
+    "sleep_quality", "steps_count", "activity_type", "calories", "mood", "habit_success",
+}
+
+
+def _uniform(rng, low, high, n, decimals=1):
+    return np.round(rng.uniform(low, high, n), decimals)
+
+
+def _split(n: int, classes: int) -> list[int]:
+    return [n // classes + (1 if i < n % classes else 0) for i in range(classes)]
+
+
+def habit_block(n: int, rng: np.random.Generator) -> np.ndarray:
+    success, failure = _split(n, 2)
+    blocks = []
+    for size, ok in ((success, True), (failure, False)):
+        blocks.append(np.column_stack([
+            _uniform(rng, 0.7, 1, size, 2) if ok else _uniform(rng, 0, 0.6, size, 2),  # previous_habit_ratio
+            _uniform(rng, 6, 9, size) if ok else _uniform(rng, 3, 7, size),           # sleep_hours
+            rng.choice([1, 2] if ok else [0, 1], size),                                 # sleep_quality
+            _uniform(rng, 2, 4, size) if ok else _uniform(rng, 0.5, 2.5, size),        # water_liters
+            rng.integers(6000, 12001, size) if ok else rng.integers(1000, 8001, size),  # steps_count
+            rng.integers(2000, 3201, size) if ok else rng.integers(1800, 2801, size),   # calories
+            _uniform(rng, 60, 150, size) if ok else _uniform(rng, 40, 100, size),      # protein
+            _uniform(rng, 200, 400, size) if ok else _uniform(rng, 150, 300, size),    # carbs
+            _uniform(rng, 50, 120, size) if ok else _uniform(rng, 40, 90, size),       # fat
+            rng.integers(3, 5, size) if ok else rng.integers(0, 3, size),              # mood
+            np.full(size, 1 if ok else 0),                                             # habit_success
+        ]))
+    return rng.permutation(np.vstack(blocks).astype(float))
+
+
+# (sleep_hours, water_liters, steps_count, habit_ratio) ranges per mood group
+_MOOD_GROUPS = (
+    ((7, 9), (2.5, 4.0), (8000, 12000), (0.7, 1.0)),   # Happy, Relaxed
+    ((5.5, 7), (1.5, 2.5), (4000, 8000), (0.4, 0.7)),  # Neutral
+    ((3, 5), (0.5, 1.5), (1000, 4000), (0.0, 0.4)),    # Sad, Angry
+)
+
+
+def mood_block(n: int, rng: np.random.Generator) -> np.ndarray:
+    # Five moods, two of which share each of the outer groups
+    sizes = _split(n, 5)
+    codes = np.repeat(np.arange(len(MOOD_CLASSES)), sizes)
+    group_sizes = (sizes[0] + sizes[1], sizes[2], sizes[3] + sizes[4])
+    blocks = []
+    offset = 0
+    for size, (sleep, water, steps, habit) in zip(group_sizes, _MOOD_GROUPS):
+        blocks.append(np.column_stack([
+            _uniform(rng, *sleep, size),                 # sleep_hours
+            rng.integers(0, 3, size),                    # sleep_quality
+            _uniform(rng, *water, size),                 # water_liters
+            rng.integers(steps[0], steps[1] + 1, size),  # steps_count
+            rng.integers(0, 4, size),                    # activity_type
+            rng.integers(1800, 3201, size),              # calories
+            _uniform(rng, 40, 150, size),                # protein
+            _uniform(rng, 150, 400, size),               # carbs
+            _uniform(rng, 40, 120, size),                # fat
+            _uniform(rng, *habit, size, 2),              # habit_completion_ratio
+            codes[offset:offset + size],                 # index into MOOD_CLASSES
+        ]))
+        offset += size
+    return rng.permutation(np.vstack(blocks).astype(float))
+
+
+# (steps, water, calories, habit_ratio, moods) per sleep quality
+_SLEEP_CLASSES = (
+    ((1000, 4000), (0.5, 1.5), (1600, 2400), (0.0, 0.4), (0, 1)),   # Poor
+    ((4000, 8000), (1.5, 2.5), (1800, 2600), (0.4, 0.7), (2, 3)),   # Average
+    ((8000, 12000), (2.5, 4.0), (2200, 3000), (0.7, 1.0), (3, 4)),  # Good
+)
+
+
+def sleep_block(n: int, rng: np.random.Generator) -> np.ndarray:
+    blocks = []
+    for quality, (size, (steps, water, calories, habit, moods)) in enumerate(zip(_split(n, 3), _SLEEP_CLASSES)):
+        blocks.append(np.column_stack([
+            rng.integers(steps[0], steps[1] + 1, size),        # steps_count
+            rng.integers(0, 4, size),                          # activity_type
+            _uniform(rng, *water, size),                       # water_liters
+            rng.integers(calories[0], calories[1] + 1, size),  # calories
+            _uniform(rng, 40, 150, size),                      # protein
+            _uniform(rng, 150, 350, size),                     # carbs
+            _uniform(rng, 40, 120, size),                      # fat
+            _uniform(rng, *habit, size, 2),                    # habit_completion_ratio
+            rng.choice(moods, size),                           # mood
+            np.full(size, quality),                            # sleep_quality
+        ]))
+    return rng.permutation(np.vstack(blocks).astype(float))
+
+
+BLOCKS = {"habit": habit_block, "mood": mood_block, "sleep": sleep_block}
+
+
+def generate(model: str, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    n balanced rows for `model` as a DataFrame laid out like its dummy CSV:
+    feature columns then the target, integer columns as ints and the mood
+    target as its label.
+    """
+    block = BLOCKS[model](n, rng)
+    columns = list(FEATURES[model]) + [TARGETS[model]]
+    data = {}
+    for i, name in enumerate(columns):
+        values = block[:, i]
+        data[name] = values.astype(np.int64) if name in INTEGER_COLUMNS else values
+    if model == "mood":
+        data["mood"] = np.asarray(MOOD_CLASSES, dtype=object)[data["mood"]]
+    return pd.DataFrame(data, copy=False)
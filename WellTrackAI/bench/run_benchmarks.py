@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The LLM is stubbed below; the client module only needs a key to import
+os.environ.setdefault("GROQ_API_KEY", "bench-stub")
+
+import numpy as np
+
+from workloads import MODEL_ROWS, predict_all_bodies
+
+BATCH_SIZES = (1, 16, 256, 4096)
+
+# Run in a fresh interpreter so imports and model loading are not cached
+STARTUP_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app):
+    started = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "startup_s": started - imported}))
+"""
+
+MEMORY_SNIPPET = """
+import json, resource, sys
+sys.path.insert(0, "bench")
+import numpy as np
+import app.main
+import app.routes.all_in_one as all_in_one
+from fastapi.testclient import TestClient
+from workloads import predict_all_bodies
+
+async def stub_llm(context_points, budget, hedge_share):
+    return {"summary": "stub", "action_items": list(context_points[:5])}, "llm"
+
+all_in_one.get_llm_recommendation_within = stub_llm
+with TestClient(app.main.app) as client:
+    for body in predict_all_bodies(%d, np.random.default_rng(%d)):
+        client.post("/predict/predict-all", json=body)
+print(json.dumps({"peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _percentiles(samples_s: list[float]) -> dict:
+    ms = np.array(samples_s) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
+
+
+def bench_inference(rng, min_time: float) -> dict:
+    """predict_proba throughput per model and batch size, called directly."""
+    from app.services.model_registry import get_predictor
+
+    results = {}
+    for model, rows in MODEL_ROWS.items():
+        predict_proba = get_predictor(model)
+        X = rows(max(BATCH_SIZES), rng)
+        predict_proba(X[:1])
+        for batch in BATCH_SIZES:
+            calls, timings = 0, []
+            deadline = time.perf_counter() + min_time
+            while time.perf_counter() < deadline or calls < 3:
+                start = (calls * batch) % (len(X) - batch + 1)
+                t0 = time.perf_counter()
+                predict_proba(X[start:start + batch])
+                timings.append(time.perf_counter() - t0)
+                calls += 1
+            per_call = statistics.median(timings)
+            results[f"{model}.batch_{batch}"] = {
+                "calls": calls,
+                "ms_per_call": round(per_call * 1000, 4),
+                "rows_per_sec": round(batch / per_call, 1),
+            }
+    return results
+
+
+def bench_predict_habit(rng, n: int) -> dict:
+    """End-to-end predict_habit latency over distinct rows (cache misses)."""
+    from app.services.habit_model import predict_habit
+
+    rows = MODEL_ROWS["habit"](n, rng).tolist()
+    timings = []
+    for row in rows:
+        t0 = time.perf_counter()
+        predict_habit(row)
+        timings.append(time.perf_counter() - t0)
+    return {"calls": n, **_percentiles(timings)}
+
+
+def bench_predict_all(rng, n: int) -> dict:
+    """/predict/predict-all through the ASGI stack with the LLM stubbed."""
+    from fastapi.testclient import TestClient
+    import app.routes.all_in_one as all_in_one
+    from app.main import app
+
+    async def stub_llm(context_points, budget, hedge_share):
+        return {"summary": "stub", "action_items": list(context_points[:5])}, "llm"
+
+    original = all_in_one.get_llm_recommendation_within
+    all_in_one.get_llm_recommendation_within = stub_llm
+    try:
+        bodies = predict_all_bodies(n, rng)
+        timings = []
+        with TestClient(app) as client:
+            client.post("/predict/predict-all", json=bodies[0])
+            started = time.perf_counter()
+            for body in bodies:
+                t0 = time.perf_counter()
+                response = client.post("/predict/predict-all", json=body)
+                timings.append(time.perf_counter() - t0)
+                response.raise_for_status()
+            elapsed = time.perf_counter() - started
+    finally:
+        all_in_one.get_llm_recommendation_within = original
+    return {"requests": n, "requests_per_sec": round(n / elapsed, 1), **_percentiles(timings)}
+
+
+def _run_snippet(code: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BASE_DIR, env=os.environ,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_startup(repeats: int) -> dict:
+    runs = [_run_snippet(STARTUP_SNIPPET) for _ in range(repeats)]
+    return {
+        "runs": repeats,
+        "import_s": round(statistics.median(r["import_s"] for r in runs), 4),
+        "startup_s": round(statistics.median(r["startup_s"] for r in runs), 4),
+    }
+
+
+def bench_memory(requests: int, seed: int) -> dict:
+    """Peak RSS of one worker process after warm-up and a predict-all workload."""
+    result = _run_snippet(MEMORY_SNIPPET % (requests, seed))
+    return {"requests": requests, "peak_rss_mb": round(result["peak_rss_mb"], 1)}
+
+
+def _environment() -> dict:
+    import sklearn
+    from app.core import config
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "inference_backend": config.INFERENCE_BACKEND,
+        "micro_batch_enabled": config.MICRO_BATCH_ENABLED,
+        "prediction_cache_enabled": config.PREDICTION_CACHE_ENABLED,
+    }
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists metrics that regressed by more than `tolerance` (a fraction).
+    *_per_sec metrics are better when higher, timings and memory when lower.
+    """
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+    regressions = []
+    for name, value in now.items():
+        old = before.get(name)
+        if not old or name.endswith((".calls", ".runs", ".requests")):
+            continue
+        change = (old - value) / old if name.endswith("_per_sec") else (value - old) / old
+        if change > tolerance:
+            regressions.append(f"{name}: {old} -> {value} ({change:+.0%} worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WellTrack inference and endpoints.")
+    parser.add_argument("--output", "-o", help="JSON file to write (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--quick", action="store_true", help="shorter runs, for smoke-testing the suite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", choices=["inference", "predict_habit", "predict_all", "startup", "memory"],
+                        help="run only these sections")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before a metric counts as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    min_time = 0.1 if args.quick else 1.0
+    calls = 200 if args.quick else 2000
+    sections = {
+        "inference": lambda: bench_inference(np.random.default_rng(args.seed), min_time),
+        "predict_habit": lambda: bench_predict_habit(np.random.default_rng(args.seed), calls),
+        "predict_all": lambda: bench_predict_all(np.random.default_rng(args.seed), calls // 2),
+        "startup": lambda: bench_startup(1 if args.quick else 5),
+        "memory": lambda: bench_memory(calls // 4, args.seed),
+    }
+
+    results = {}
+    for name, run in sections.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = run()
+
+    report = {"environment": _environment(), "results": results}
+    output = args.output or os.path.join(
+        BASE_DIR, "bench", "results", f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.synthetic import habit_block, mood_block, sleep_block
+
+# Feature matrices drawn from the shared synthetic generators, without the
+# class column. Columns follow the *_FEATURES order in app/services/features.py.
+
+
+def habit_rows(n: int, rng: np.random.Generator) -> np.ndarray:
+    return habit_block(n, rng)[:, :-1]
+
+
+def mood_rows(n: int, rng: np.random.Generator) -> np.ndarray:
+    return mood_block(n, rng)[:, :-1]
+
+
+def sleep_rows(n: int, rng: np.random.Generator) -> np.ndarray:
+    return sleep_block(n, rng)[:, :-1]
+
+
+MODEL_ROWS = {"habit": habit_rows, "mood": mood_rows, "sleep": sleep_rows}
+
+SLEEP_QUALITY_LABELS = ("Poor", "Average", "Good")
+MOOD_LABELS = ("Angry", "Sad", "Neutral", "Relaxed", "Happy")
+
+
+def predict_all_bodies(n: int, rng: np.random.Generator) -> list[dict]:
+    """/predict/predict-all request bodies built from habit-style rows."""
+    rows = habit_rows(n, rng)
+    activity = rng.integers(0, 4, n)
+    return [
+        {
+            "habit": {"previous_habit_ratio": row[0]},
+            "sleep": {"hours": row[1], "quality": SLEEP_QUALITY_LABELS[int(row[2])]},
+            "mood": {"value": MOOD_LABELS[int(row[9])], "activity_type": int(act)},
+            "steps": int(row[4]),
+            "water_liters": row[3],
+            "calories": int(row[5]),
+            "protein": row[6],
+            "carbs": row[7],
+            "fat": row[8],
+        }
+        for row, act in zip(rows.tolist(), activity.tolist())
+    ]
@@ -1,5 +1,21 @@
-import pandas as pd
+import argparse
+import os
 import random
+import sys
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.dataset import DUMMY_PARTITION, write_partition
+
+parser = argparse.ArgumentParser(description="Generate the dummy habit dataset.")
+parser.add_argument("--date", default=DUMMY_PARTITION,
+                    help="date partition to write; re-running replaces it (default: %(default)s)")
+parser.add_argument("--compress", action="store_true", help="zlib-compress the columns (smaller, not memory-mappable)")
+parser.add_argument("--csv", action="store_true", help="also write data/habit_dummy_data.csv")
+args = parser.parse_args()
 
 random.seed(42)
 ROWS_PER_CLASS = 500  # To make balanced dataset
@@ -47,6 +63,9 @@ columns = [
 ]
 
 df = pd.DataFrame(data, columns=columns)
-df.to_csv("data/habit_dummy_data.csv", index=False)
+path = write_partition(os.path.join(BASE_DIR, "data", "habit"), df, args.date, compress=args.compress)
+print("Dataset partition written to", path)
+if args.csv:
+    df.to_csv(os.path.join(BASE_DIR, "data", "habit_dummy_data.csv"), index=False)
 print("Balanced habit dataset created with shape:", df.shape)
 print("Habit success distribution:\n", df["habit_success"].value_counts())
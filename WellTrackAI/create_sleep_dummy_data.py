@@ -1,5 +1,21 @@
-import pandas as pd
+import argparse
+import os
 import random
+import sys
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.dataset import DUMMY_PARTITION, write_partition
+
+parser = argparse.ArgumentParser(description="Generate the dummy sleep dataset.")
+parser.add_argument("--date", default=DUMMY_PARTITION,
+                    help="date partition to write; re-running replaces it (default: %(default)s)")
+parser.add_argument("--compress", action="store_true", help="zlib-compress the columns (smaller, not memory-mappable)")
+parser.add_argument("--csv", action="store_true", help="also write data/sleep_dummy_data.csv")
+args = parser.parse_args()
 
 random.seed(42)
 
@@ -61,6 +77,9 @@ columns = [
 ]
 
 df = pd.DataFrame(data, columns=columns)
-df.to_csv("sleep_dummy_data.csv", index=False)
+path = write_partition(os.path.join(BASE_DIR, "data", "sleep"), df, args.date, compress=args.compress)
+print("Dataset partition written to", path)
+if args.csv:
+    df.to_csv(os.path.join(BASE_DIR, "data", "sleep_dummy_data.csv"), index=False)
 
 print("Balanced sleep dataset created:", df["sleep_quality"].value_counts())
@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.dataset import write_partition
+from app.services.synthetic import BLOCKS, TARGETS, generate
+
+
+def _chunk_rng(seed: int, model: str, index: int) -> np.random.Generator:
+    # One stream per (model, chunk) so output does not depend on --workers
+    return np.random.default_rng([seed, list(BLOCKS).index(model), index])
+
+
+def write_dataset_chunk(model: str, index: int, rows: int, seed: int, root: str,
+                        partition: str, compress: bool) -> int:
+    df = generate(model, rows, _chunk_rng(seed, model, index))
+    write_partition(root, df, partition, compress=compress)
+    return len(df)
+
+
+def format_csv_chunk(model: str, index: int, rows: int, seed: int) -> str:
+    """The chunk as CSV text, header included for the first chunk only."""
+    df = generate(model, rows, _chunk_rng(seed, model, index))
+    return df.to_csv(index=False, header=index == 0)
+
+
+def _run_ordered(executor, jobs: list, workers: int):
+    """
+    Yields job results in job order. At most 2 * workers jobs are in
+    flight, so finished chunks never pile up in memory ahead of the writer.
+    """
+    if executor is None:
+        for fn, *job_args in jobs:
+            yield fn(*job_args)
+        return
+    pending = deque()
+    for fn, *job_args in jobs:
+        pending.append(executor.submit(fn, *job_args))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _chunk_sizes(rows: int, chunk_rows: int) -> list[int]:
+    return [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate balanced synthetic habit, mood and sleep data at any size, "
+                    "with the per-class distributions of the create_*_dummy_data.py scripts."
+    )
+    parser.add_argument("--models", nargs="+", choices=list(BLOCKS), default=list(BLOCKS))
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per model")
+    parser.add_argument("--chunk-rows", type=int, default=500_000,
+                        help="rows generated and written at a time; each chunk is balanced across classes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="processes generating chunks in parallel")
+    parser.add_argument("--format", choices=["dataset", "csv"], default="dataset",
+                        help="dataset: one date partition per chunk under <output-dir>/<model>/; "
+                             "csv: <output-dir>/<model>_synthetic.csv")
+    parser.add_argument("--start-date", default=date.today().isoformat(),
+                        help="date of the first dataset partition; later chunks take the following days")
+    parser.add_argument("--compress", action="store_true", help="zlib-compress dataset columns")
+    parser.add_argument("--output-dir", default=os.path.join(BASE_DIR, "data", "synthetic"))
+    args = parser.parse_args()
+
+    sizes = _chunk_sizes(args.rows, args.chunk_rows)
+    first_day = date.fromisoformat(args.start_date)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    started = time.perf_counter()
+    try:
+        for model in args.models:
+            model_started = time.perf_counter()
+            if args.format == "dataset":
+                target = os.path.join(args.output_dir, model)
+                jobs = [
+                    (write_dataset_chunk, model, i, rows, args.seed, target,
+                     (first_day + timedelta(days=i)).isoformat(), args.compress)
+                    for i, rows in enumerate(sizes)
+                ]
+                for _ in _run_ordered(executor, jobs, args.workers):
+                    pass
+            else:
+                target = os.path.join(args.output_dir, f"{model}_synthetic.csv")
+                jobs = [(format_csv_chunk, model, i, rows, args.seed) for i, rows in enumerate(sizes)]
+                with open(target, "w", encoding="utf-8", newline="") as f:
+                    for text in _run_ordered(executor, jobs, args.workers):
+                        f.write(text)
+
+            elapsed = time.perf_counter() - model_started
+            print(f"{model:<6} {args.rows} rows ({TARGETS[model]}) in {len(sizes)} chunks, "
+                  f"{elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s) -> {target}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
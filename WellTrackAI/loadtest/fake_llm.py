@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Stands in for the Groq API during load tests. Point the service at it with
+#   GROQ_BASE_URL=http://127.0.0.1:8900 GROQ_API_KEY=fake uvicorn app.main:app
+
+RECOMMENDATION_TEXT = """You're on a steady path, with a few easy wins available tomorrow.
+- Drink a glass of water with every meal to reach 2 liters
+- Take a 20 minute walk after lunch to add around 2500 steps
+- Add a protein source such as eggs, yogurt or beans to breakfast
+- Keep a consistent bedtime and avoid screens for the last 30 minutes"""
+
+MOTIVATION_TEXT = "Small steps today lead to big wins tomorrow. Keep going 💪"
+
+parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat completions API.")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8900)
+parser.add_argument("--latency-ms", type=float, default=300, help="mean time to the full completion")
+parser.add_argument("--jitter-ms", type=float, default=100, help="uniform +/- jitter added to the latency")
+parser.add_argument("--failure-rate", type=float, default=0.0, help="share of calls that fail")
+parser.add_argument("--failure-status", type=int, default=503, help="HTTP status of failed calls (429, 500, 503...)")
+parser.add_argument("--malformed-rate", type=float, default=0.0,
+                    help="share of users left out of batched (JSON) replies")
+parser.add_argument("--seed", type=int, default=None)
+args = parser.parse_args()
+
+rng = random.Random(args.seed)
+app = FastAPI(title="Fake Groq")
+stats = {"calls": 0, "failures": 0, "streamed": 0}
+
+
+def _latency() -> float:
+    return max(0.0, args.latency_ms + rng.uniform(-args.jitter_ms, args.jitter_ms)) / 1000
+
+
+def _batch_reply(prompt: str) -> str:
+    """A JSON reply to a multi-user prompt, dropping --malformed-rate of the users."""
+    summary, *items = [line.strip("- ") for line in RECOMMENDATION_TEXT.splitlines()]
+    results = [
+        {"id": int(user_id), "summary": summary, "action_items": items}
+        for user_id in re.findall(r"^User (\d+):", prompt, re.MULTILINE)
+        if rng.random() >= args.malformed_rate
+    ]
+    return json.dumps({"results": results})
+
+
+def _reply_for(messages: list) -> str:
+    prompt = " ".join(str(message.get("content", "")) for message in messages)
+    if '"results"' in prompt:
+        return _batch_reply(prompt)
+    return MOTIVATION_TEXT if "motivational" in prompt else RECOMMENDATION_TEXT
+
+
+def _usage(messages: list, text: str) -> dict:
+    # Roughly four characters per token, enough for token metrics
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    completion_tokens = len(text) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["calls"] += 1
+    latency = _latency()
+
+    if rng.random() < args.failure_rate:
+        stats["failures"] += 1
+        await asyncio.sleep(latency / 2)
+        return JSONResponse(
+            status_code=args.failure_status,
+            content={"error": {"message": "Injected failure", "type": "fake_llm_error"}},
+        )
+
+    messages = body.get("messages", [])
+    text = _reply_for(messages)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "fake-model")
+
+    if body.get("stream"):
+        stats["streamed"] += 1
+        return StreamingResponse(
+            _stream(completion_id, created, model, text, latency, _usage(messages, text)),
+            media_type="text/event-stream",
+        )
+
+    await asyncio.sleep(latency)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": _usage(messages, text),
+    }
+
+
+async def _stream(completion_id: str, created: int, model: str, text: str, latency: float, usage: dict):
+    # Words are spread evenly over the latency, like tokens arriving
+    words = text.split(" ")
+    delay = latency / max(1, len(words))
+
+    def chunk(delta: dict, finish_reason=None, **extra) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i, word in enumerate(words):
+        await asyncio.sleep(delay)
+        yield chunk({"content": word if i == 0 else f" {word}"})
+    yield chunk({}, "stop", x_groq={"id": completion_id, "usage": usage})
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
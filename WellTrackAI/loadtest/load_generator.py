@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "bench"))
+
+from app.services.features import FEATURES
+from workloads import MODEL_ROWS, predict_all_bodies
+
+INTEGER_FEATURES = {"sleep_quality", "steps_count", "calories", "mood", "activity_type"}
+
+TARGETS = {
+    "predict-all": ("POST", "/predict/predict-all"),
+    "habit": ("POST", "/predict/habit"),
+    "mood": ("POST", "/predict/mood"),
+    "sleep": ("POST", "/predict/sleep"),
+    "motivation": ("POST", "/motivation/daily"),
+}
+
+
+def build_bodies(target: str, n: int, rng: np.random.Generator) -> list:
+    if target == "predict-all":
+        return predict_all_bodies(n, rng)
+    if target == "motivation":
+        return [None] * n
+    names = FEATURES[target]
+    return [
+        {name: int(value) if name in INTEGER_FEATURES else value for name, value in zip(names, row)}
+        for row in MODEL_ROWS[target](n, rng).tolist()
+    ]
+
+
+def parse_mix(mix: str) -> dict:
+    """'predict-all=3,habit=1' -> normalized weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in TARGETS:
+            raise SystemExit(f"Unknown target {name!r}; choose from {', '.join(TARGETS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+async def run_level(client: httpx.AsyncClient, rps: float, duration: float, mix: dict,
+                    bodies: dict, max_in_flight: int, rng: np.random.Generator) -> dict:
+    """
+    Open-loop load: requests start on a fixed schedule whatever the
+    response times, so a slow server shows up as latency instead of
+    quietly lowering the offered rate. Start delay counts toward latency.
+    """
+    n_requests = int(rps * duration)
+    targets = rng.choice(list(mix), size=n_requests, p=list(mix.values()))
+    latencies = {name: [] for name in mix}
+    outcomes = {name: Counter() for name in mix}
+    in_flight = asyncio.Semaphore(max_in_flight)
+    dropped = Counter()
+    cursor = Counter()
+
+    async def fire(target: str, scheduled: float):
+        if in_flight.locked():
+            dropped[target] += 1
+            return
+        async with in_flight:
+            method, path = TARGETS[target]
+            body = bodies[target][cursor[target] % len(bodies[target])]
+            cursor[target] += 1
+            try:
+                response = await client.request(method, path, json=body)
+                outcomes[target][str(response.status_code)] += 1
+            except httpx.HTTPError as exc:
+                outcomes[target][type(exc).__name__] += 1
+            latencies[target].append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    tasks = []
+    for i, target in enumerate(targets):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(target, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    per_target = {}
+    for name in mix:
+        ms = np.array(latencies[name]) * 1000
+        total = sum(outcomes[name].values())
+        ok = sum(count for status, count in outcomes[name].items() if status.startswith("2"))
+        per_target[name] = {
+            "sent": total,
+            "dropped": dropped[name],
+            "ok": ok,
+            "error_rate": round((total - ok) / total, 4) if total else 0.0,
+            "outcomes": dict(outcomes[name]),
+            **({
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p90_ms": round(float(np.percentile(ms, 90)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "max_ms": round(float(ms.max()), 2),
+            } if len(ms) else {}),
+        }
+
+    ok_total = sum(t["ok"] for t in per_target.values())
+    sent_total = sum(t["sent"] for t in per_target.values())
+    return {
+        "offered_rps": rps,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(ok_total / elapsed, 1),
+        "error_rate": round((sent_total - ok_total) / sent_total, 4) if sent_total else 0.0,
+        "dropped": sum(dropped.values()),
+        "targets": per_target,
+    }
+
+
+def print_level(result: dict):
+    print(f"\n== {result['offered_rps']} rps for {result['duration_s']}s: "
+          f"{result['throughput_rps']} ok/s, error rate {result['error_rate']:.2%}, "
+          f"dropped {result['dropped']}")
+    print(f"{'target':<12}{'sent':>7}{'ok':>7}{'err%':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, t in result["targets"].items():
+        print(f"{name:<12}{t['sent']:>7}{t['ok']:>7}{t['error_rate']:>8.2%}"
+              f"{t.get('p50_ms', 0):>9.1f}{t.get('p90_ms', 0):>9.1f}{t.get('p99_ms', 0):>9.1f}{t.get('max_ms', 0):>9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Drive the WellTrack AI service at fixed request rates.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="service base URL")
+    parser.add_argument("--rps", type=float, nargs="+", default=[10, 50, 100], help="request rates to run, in order")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per rate")
+    parser.add_argument("--mix", default="predict-all=4,habit=2,mood=2,sleep=2,motivation=1",
+                        help="target weights, e.g. 'predict-all=1' (targets: %s)" % ", ".join(TARGETS))
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="requests beyond this many outstanding are dropped and counted")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", help="write the results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    mix = parse_mix(args.mix)
+    bodies = {name: build_bodies(name, 2000, rng) for name in mix}
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        for rps in args.rps:
+            result = await run_level(client, rps, args.duration, mix, bodies, args.max_in_flight, rng)
+            print_level(result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "mix": mix, "levels": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.core.config import (
+    BULK_RECOMMENDATION_BATCH_SIZE,
+    BULK_RECOMMENDATION_CONCURRENCY,
+    COHORT_CHUNK_SIZE,
+    COHORT_WORKERS,
+)
+from app.services import llm_client
+from app.services.bulk_recommendations import generate_bulk_recommendations
+from app.services.pipeline import score_cohort
+from app.services.recommendation_rules import insight_messages
+
+parser = argparse.ArgumentParser(
+    description="Generate LLM recommendations for a whole cohort CSV, several users per prompt."
+)
+parser.add_argument("input", help="CSV with one row per user and the chain input columns")
+parser.add_argument("output", help="JSON Lines file to write, one recommendation per user")
+parser.add_argument("--id-column", default="user_id", help="column identifying users (default: the row number)")
+parser.add_argument("--batch-size", type=int, default=BULK_RECOMMENDATION_BATCH_SIZE, help="users per LLM prompt")
+parser.add_argument("--concurrency", type=int, default=BULK_RECOMMENDATION_CONCURRENCY,
+                    help="batched LLM calls in flight at once")
+parser.add_argument("--chunk-size", type=int, default=COHORT_CHUNK_SIZE, help="rows per vectorized model stage")
+parser.add_argument("--workers", type=int, default=COHORT_WORKERS, help="threads scoring chunks in parallel")
+args = parser.parse_args()
+
+
+async def recommend(insights: list) -> list:
+    try:
+        return await generate_bulk_recommendations(insights, args.batch_size, args.concurrency)
+    finally:
+        await llm_client.close()
+
+
+df = pd.read_csv(args.input)
+user_ids = df[args.id_column].tolist() if args.id_column in df else list(range(len(df)))
+
+start = time.perf_counter()
+result = score_cohort(df, chunk_size=args.chunk_size, workers=args.workers)
+insights = insight_messages(pd.concat([df, result], axis=1))
+scored = time.perf_counter()
+
+recommendations = asyncio.run(recommend(insights))
+elapsed = time.perf_counter() - start
+
+with open(args.output, "w", encoding="utf-8") as f:
+    for user_id, points, (recommendation, source) in zip(user_ids, insights, recommendations):
+        f.write(json.dumps({
+            "user_id": user_id,
+            "insights": points,
+            **(recommendation or {"summary": None, "action_items": []}),
+            "source": source,
+        }) + "\n")
+
+sources = Counter(source for _, source in recommendations)
+print(f"Scored {len(df)} users in {scored - start:.2f}s, recommendations in {elapsed - (scored - start):.2f}s")
+print("By source: " + ", ".join(f"{name}={count}" for name, count in sorted(sources.items())))
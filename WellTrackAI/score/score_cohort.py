@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.core.config import COHORT_CHUNK_SIZE, COHORT_WORKERS
+from app.services.pipeline import score_cohort
+from app.services.recommendation_rules import RULE_SET, evaluate_insights
+
+parser = argparse.ArgumentParser(
+    description="Score a cohort CSV through the habit -> mood -> sleep chain (no rules, no LLM)."
+)
+parser.add_argument("input", help="CSV with one row per user and the chain input columns")
+parser.add_argument("output", help="CSV to write; input columns followed by the result columns")
+parser.add_argument("--chunk-size", type=int, default=COHORT_CHUNK_SIZE, help="rows per vectorized stage")
+parser.add_argument("--workers", type=int, default=COHORT_WORKERS, help="threads scoring chunks in parallel")
+parser.add_argument("--insights", action="store_true",
+                    help="also add one boolean insight_<code> column per recommendation rule")
+args = parser.parse_args()
+
+df = pd.read_csv(args.input)
+
+start = time.perf_counter()
+result = score_cohort(df, chunk_size=args.chunk_size, workers=args.workers)
+if args.insights:
+    insights = evaluate_insights(pd.concat([df, result], axis=1))
+    result = pd.concat([
+        result,
+        pd.DataFrame(insights, columns=[f"insight_{code}" for code in RULE_SET.codes], index=df.index),
+    ], axis=1)
+elapsed = time.perf_counter() - start
+
+pd.concat([df, result], axis=1).to_csv(args.output, index=False)
+print(f"Scored {len(df)} users in {elapsed:.2f}s")
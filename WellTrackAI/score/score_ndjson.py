@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.core.config import BULK_CHUNK_SIZE
+from app.services.bulk_scoring import score_lines
+
+parser = argparse.ArgumentParser(
+    description="Score newline-delimited JSON records with the WellTrack models."
+)
+parser.add_argument("model", choices=["habit", "mood", "sleep", "chain"],
+                    help="model to score with; 'chain' runs habit -> mood -> sleep like predict-all")
+parser.add_argument("--input", "-i", default="-", help="NDJSON input file (default: stdin)")
+parser.add_argument("--output", "-o", default="-", help="NDJSON output file (default: stdout)")
+parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE, help="records per batched prediction")
+args = parser.parse_args()
+
+source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+
+start = time.perf_counter()
+rows = 0
+with source, target:
+    for output in score_lines(args.model, source, args.chunk_size):
+        target.write(output)
+        rows += output.count(b"\n")
+
+elapsed = time.perf_counter() - start
+print(f"Scored {rows} records in {elapsed:.2f}s", file=sys.stderr)
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.model_registry import (
+    MODEL_FILES,
+    _compiled_path,
+    compile_model,
+    get_mood_labels,
+    get_sklearn_model,
+)
+from app.services.synthetic import FEATURES, TARGETS, generate
+
+# Named FlatForest.from_sklearn option sets; serve one with MODEL_VARIANT=<name>
+VARIANTS = {
+    "compact": {"compact": True},
+    "slim": {"compact": True, "max_trees": 50, "min_samples_split": 10},
+    "tiny": {"compact": True, "max_trees": 25, "max_depth": 8},
+}
+
+
+def _median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 4)
+
+
+def evaluate(path: str, X: np.ndarray, y: np.ndarray, reference: np.ndarray, repeats: int) -> dict:
+    """Size, load time, latency and accuracy of one exported forest."""
+    load_ms = _median_ms(lambda: joblib.load(path), repeats)
+    forest = joblib.load(path)
+    predicted = forest.predict_proba(X).argmax(axis=1)
+    return {
+        "path": os.path.relpath(path, BASE_DIR),
+        "trees": forest.n_trees,
+        "nodes": len(forest.left),
+        "file_bytes": os.path.getsize(path),
+        "memory_bytes": forest.nbytes,
+        "load_ms": load_ms,
+        "latency_1_row_ms": _median_ms(lambda: forest.predict_proba(X[:1]), repeats * 20),
+        "latency_256_rows_ms": _median_ms(lambda: forest.predict_proba(X[:256]), repeats * 4),
+        "accuracy": round(float((predicted == y).mean()), 4),
+        "agreement": round(float((predicted == reference).mean()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export slimmed flat-forest variants of the trained models and report "
+                    "what each one costs and saves against the exact export."
+    )
+    parser.add_argument("--models", nargs="+", choices=list(MODEL_FILES), default=list(MODEL_FILES))
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--name", help="also export a custom variant under this name, built from the options below")
+    parser.add_argument("--max-trees", type=int)
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--min-samples-split", type=int, default=0)
+    parser.add_argument("--no-compact", action="store_true", help="keep float64/intp arrays in the custom variant")
+    parser.add_argument("--eval-rows", type=int, default=20_000,
+                        help="synthetic rows per model used to measure accuracy")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", "-o", help="write the report as JSON")
+    args = parser.parse_args()
+
+    variants = {name: VARIANTS[name] for name in args.variants}
+    if args.name:
+        variants[args.name] = {
+            "compact": not args.no_compact,
+            "max_trees": args.max_trees,
+            "max_depth": args.max_depth,
+            "min_samples_split": args.min_samples_split,
+        }
+
+    report = {}
+    for name in args.models:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = get_sklearn_model(name)
+        df = generate(name, args.eval_rows, np.random.default_rng(args.seed))
+        X = df[list(FEATURES[name])].to_numpy(dtype=np.float64)
+        y = df[TARGETS[name]].to_numpy()
+        if name == "mood":
+            # The forest predicts label-encoder ids
+            y = np.searchsorted(get_mood_labels(), y)
+        y = np.searchsorted(model.classes_, y)
+
+        exact_path = compile_model(name)
+        reference = joblib.load(exact_path).predict_proba(X).argmax(axis=1)
+        exact = evaluate(exact_path, X, y, reference, args.repeats)
+        report[name] = {"exact": exact}
+
+        print(f"\n{name}: {args.eval_rows} synthetic rows")
+        print(f"{'variant':<10}{'trees':>6}{'nodes':>8}{'file KB':>10}{'mem KB':>9}{'load ms':>9}"
+              f"{'1 row ms':>10}{'256 ms':>9}{'accuracy':>10}{'change':>8}{'agree':>8}")
+        for variant, options in {"exact": None, **variants}.items():
+            if options is None:
+                result = exact
+            else:
+                path = compile_model(name, variant, **options)
+                result = evaluate(path, X, y, reference, args.repeats)
+                result["options"] = options
+                report[name][variant] = result
+            change = result["accuracy"] - exact["accuracy"]
+            print(f"{variant:<10}{result['trees']:>6}{result['nodes']:>8}{result['file_bytes'] / 1024:>10.1f}"
+                  f"{result['memory_bytes'] / 1024:>9.1f}{result['load_ms']:>9.2f}{result['latency_1_row_ms']:>10.3f}"
+                  f"{result['latency_256_rows_ms']:>9.3f}{result['accuracy']:>10.4f}{change:>+8.4f}{result['agreement']:>8.4f}")
+
+    print(f"\nArtifacts are in {os.path.dirname(_compiled_path(args.models[0]))}; "
+          f"serve one with MODEL_VARIANT=<variant>")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,22 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.dataset import load_frame
+from app.services.features import MOOD_FEATURES
+
+DATASET_DIR = os.path.join(BASE_DIR, "data", "mood")
 DATA_PATH = os.path.join(BASE_DIR, "data", "mood_dummy_data.csv")
 
-df = pd.read_csv(DATA_PATH)
+# Only this model's columns are read from the columnar dataset
+df = load_frame(DATASET_DIR, DATA_PATH, list(MOOD_FEATURES) + ["mood"])
 
 X = df.drop("mood", axis=1)
 y = df["mood"]
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.services import dataset
+from app.services.features import HABIT_FEATURES, MOOD_FEATURES, SLEEP_FEATURES
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+RUN_LOG = os.path.join(MODEL_DIR, "training_runs.jsonl")
+
+# Same targets and hyperparameters as train_habit/mood/sleep_model.py
+MODEL_SPECS = {
+    "habit": {
+        "data": "habit_dummy_data.csv",
+        "target": "habit_success",
+        "features": HABIT_FEATURES,
+        "classes": (0, 1),
+        "params": {"n_estimators": 100, "random_state": 42},
+    },
+    "mood": {
+        "data": "mood_dummy_data.csv",
+        "target": "mood",
+        "features": MOOD_FEATURES,
+        "classes": ("Angry", "Happy", "Neutral", "Relaxed", "Sad"),
+        "label_encoder": "mood_label_encoder.pkl",
+        "params": {"n_estimators": 100, "random_state": 42, "class_weight": "balanced"},
+    },
+    "sleep": {
+        "data": "sleep_dummy_data.csv",
+        "target": "sleep_quality",
+        "features": SLEEP_FEATURES,
+        "classes": (0, 1, 2),
+        "params": {"n_estimators": 200, "max_depth": 10, "random_state": 42},
+    },
+}
+
+
+def count_rows(path: str, since: str = None) -> int:
+    """Counts data rows without parsing: dataset or Parquet metadata, or CSV newlines."""
+    if os.path.isdir(path):
+        return dataset.count_rows(path, start=since)
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        lines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+    return max(0, lines - 1)
+
+
+def iter_chunks(path: str, columns: list, chunk_rows: int, since: str = None):
+    """
+    Yields DataFrames of at most chunk_rows rows holding only `columns`.
+    A columnar dataset directory is read partition by partition, starting
+    at `since` when given.
+    """
+    if os.path.isdir(path):
+        for frame in dataset.iter_dataset(path, columns, start=since):
+            for start in range(0, len(frame), chunk_rows):
+                yield frame.iloc[start:start + chunk_rows]
+    elif path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("pyarrow is required to read Parquet input")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+
+
+def iter_blocks(paths: list, spec: dict, chunk_rows: int, since: str = None):
+    """
+    Streams (X, y) blocks of about chunk_rows rows. Chunks are carried over
+    until every class is present, because each block grows trees that must
+    share the forest's class list. One block is held back so a trailing
+    remainder that lacks a class can be merged into it instead of dropped.
+    """
+    columns = list(spec["features"]) + [spec["target"]]
+    classes = set(spec["classes"])
+    pending = []
+    held = None
+
+    def to_arrays(frames):
+        df = pd.concat(frames, ignore_index=True)
+        return df[list(spec["features"])].to_numpy(dtype=np.float32), df[spec["target"]].to_numpy()
+
+    for path in paths:
+        for chunk in iter_chunks(path, columns, chunk_rows, since):
+            pending.append(chunk)
+            if sum(len(c) for c in pending) < chunk_rows:
+                continue
+            if not classes <= set(pd.concat([c[spec["target"]] for c in pending]).unique()):
+                continue
+            if held is not None:
+                yield to_arrays(held)
+            held, pending = pending, []
+
+    if pending:
+        remainder = to_arrays(pending)
+        if classes <= set(np.unique(remainder[1])):
+            if held is not None:
+                yield to_arrays(held)
+            yield remainder
+            return
+        if held is None:
+            print(f"Skipped {len(remainder[1])} rows that do not cover every class", file=sys.stderr)
+            return
+        held = held + pending
+    if held is not None:
+        yield to_arrays(held)
+
+
+def _encode(spec: dict, encoder, y: np.ndarray) -> np.ndarray:
+    if encoder is None:
+        return y.astype(int)
+    return encoder.transform(y)
+
+
+def _atomic_dump(obj, path: str):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def train_model(name: str, paths: list, incremental: bool, new_trees: int, chunk_rows: int,
+                test_size: float, max_test_rows: int, n_jobs: int, since: str = None) -> dict:
+    """
+    Trains one model from streamed blocks and saves it. A fresh model
+    spreads n_estimators over the blocks in proportion to their rows;
+    an incremental run loads the saved forest and warm-starts new_trees
+    more trees on the new data, keeping the existing ones.
+    """
+    spec = MODEL_SPECS[name]
+    started = time.perf_counter()
+    model_path = os.path.join(MODEL_DIR, f"{name}_model.pkl")
+    total_rows = sum(count_rows(path, since) for path in paths)
+
+    encoder = None
+    if spec.get("label_encoder"):
+        encoder_path = os.path.join(MODEL_DIR, spec["label_encoder"])
+        if incremental:
+            encoder = joblib.load(encoder_path)
+        else:
+            encoder = LabelEncoder().fit(list(spec["classes"]))
+
+    if incremental:
+        model = joblib.load(model_path)
+        model.set_params(warm_start=True, n_jobs=n_jobs)
+        tree_budget = new_trees
+    else:
+        model = RandomForestClassifier(**spec["params"], warm_start=True, n_jobs=n_jobs)
+        model.set_params(n_estimators=0)
+        tree_budget = spec["params"]["n_estimators"]
+    trees_before = len(getattr(model, "estimators_", []))
+
+    rng = np.random.default_rng(42)
+    test_X, test_y = [], []
+    test_rows = 0
+    train_rows = 0
+    rows_seen = 0
+    trees_assigned = 0
+    blocks = 0
+    fit_seconds = 0.0
+
+    for X, y in iter_blocks(paths, spec, chunk_rows, since):
+        y = _encode(spec, encoder, y)
+        # Each block gets its share of the tree budget by rows read so far
+        rows_seen += len(y)
+        trees = max(1, round(tree_budget * min(1.0, rows_seen / max(1, total_rows))) - trees_assigned)
+        trees_assigned += trees
+
+        holdout = rng.random(len(y)) < test_size
+        if test_rows < max_test_rows:
+            test_X.append(X[holdout])
+            test_y.append(y[holdout])
+            test_rows += int(holdout.sum())
+        X, y = X[~holdout], y[~holdout]
+
+        model.set_params(n_estimators=model.n_estimators + trees)
+        fit_start = time.perf_counter()
+        model.fit(X, y)
+        fit_seconds += time.perf_counter() - fit_start
+        train_rows += len(y)
+        blocks += 1
+
+    if blocks == 0:
+        raise SystemExit(f"No usable training data for the {name} model")
+
+    accuracy = None
+    if test_rows:
+        accuracy = float((model.predict(np.vstack(test_X)) == np.concatenate(test_y)).mean())
+
+    # Saved forests are plain; warm_start only matters while training
+    model.set_params(warm_start=False, n_jobs=None)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    _atomic_dump(model, model_path)
+    if encoder is not None and not incremental:
+        _atomic_dump(encoder, os.path.join(MODEL_DIR, spec["label_encoder"]))
+
+    return {
+        "model": name,
+        "mode": "incremental" if incremental else "full",
+        "sources": [os.path.relpath(path, BASE_DIR) for path in paths],
+        "since": since,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "blocks": blocks,
+        "trees_added": len(model.estimators_) - trees_before,
+        "trees_total": len(model.estimators_),
+        "accuracy": round(accuracy, 4) if accuracy is not None else None,
+        "fit_seconds": round(fit_seconds, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "model_bytes": os.path.getsize(model_path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the habit, mood and sleep models in parallel, from the columnar dataset, "
+                    "CSV or Parquet streamed in chunks."
+    )
+    parser.add_argument("--models", nargs="+", choices=list(MODEL_SPECS), default=list(MODEL_SPECS))
+    parser.add_argument("--data", nargs="+", metavar="MODEL=PATH", default=[],
+                        help="input files or dataset directories per model, e.g. habit=data/new/habit.csv; "
+                             "defaults to data/<model>/ when it holds partitions, else data/<model>_dummy_data.csv")
+    parser.add_argument("--since", metavar="YYYY-MM-DD",
+                        help="only read dataset partitions from this date on, e.g. with --incremental")
+    parser.add_argument("--incremental", action="store_true",
+                        help="add trees trained on the new data to the saved models instead of retraining")
+    parser.add_argument("--new-trees", type=int, default=20, help="trees added per model by an incremental run")
+    parser.add_argument("--chunk-rows", type=int, default=500_000, help="rows read and fitted per block")
+    parser.add_argument("--test-size", type=float, default=0.2, help="share of each block held out for accuracy")
+    parser.add_argument("--max-test-rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None, help="models trained at once (default: one per model)")
+    args = parser.parse_args()
+
+    paths = {name: [] for name in args.models}
+    for item in args.data:
+        name, _, path = item.partition("=")
+        if name not in paths or not path:
+            raise SystemExit(f"--data expects MODEL=PATH for one of {', '.join(args.models)}, got {item!r}")
+        paths[name].append(os.path.abspath(path))
+    for name in args.models:
+        if not paths[name]:
+            dataset_dir = os.path.join(DATA_DIR, name)
+            paths[name] = [dataset_dir if dataset.is_dataset(dataset_dir) else os.path.join(DATA_DIR, MODEL_SPECS[name]["data"])]
+
+    workers = args.workers or len(args.models)
+    # Split the cores between the models trained side by side
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                train_model, name, paths[name], args.incremental, args.new_trees,
+                args.chunk_rows, args.test_size, args.max_test_rows, n_jobs, args.since,
+            )
+            for name in args.models
+        ]
+        runs = [future.result() for future in futures]
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    with open(RUN_LOG, "a", encoding="utf-8") as f:
+        for run in runs:
+            f.write(json.dumps(run) + "\n")
+
+    for run in runs:
+        print(
+            f"{run['model']:<6} {run['mode']:<11} rows={run['train_rows']:<9} trees={run['trees_total']:<4} "
+            f"accuracy={run['accuracy']} fit={run['fit_seconds']}s size={run['model_bytes'] / 1e6:.1f}MB"
+        )
+    print(f"Trained {len(runs)} models in {time.perf_counter() - started:.2f}s; runs logged to {RUN_LOG}")
+
+
+if __name__ == "__main__":
+    main()
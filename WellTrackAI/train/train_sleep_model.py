@@ -1,5 +1,5 @@
-import pandas as pd
 import os
+import sys
 import joblib
 
 from sklearn.model_selection import train_test_split
@@ -8,13 +8,20 @@ from sklearn.metrics import accuracy_score, classification_report
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.services.dataset import load_frame
+from app.services.features import SLEEP_FEATURES
+
+DATASET_DIR = os.path.join(BASE_DIR, "data", "sleep")
 
 DATA_PATH = os.path.join(BASE_DIR, "data", "sleep_dummy_data.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "models")
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-df = pd.read_csv(DATA_PATH)
+# Only this model's columns are read from the columnar dataset
+df = load_frame(DATASET_DIR, DATA_PATH, list(SLEEP_FEATURES) + ["sleep_quality"])
 
 X = df.drop("sleep_quality", axis=1)
 y = df["sleep_quality"]